@@ -0,0 +1,205 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+
+from dotenv import load_dotenv
+
+from llm import llm_router
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS
+
+# Load environment variables
+load_dotenv()
+
+# Admission configuration; the concurrency limit defaults to the total capacity of the LLM backends
+ADMISSION_MAX_CONCURRENCY = int(os.getenv(
+    'ADMISSION_MAX_CONCURRENCY', str(sum(backend.max_concurrency for backend in llm_router.backends))
+))
+ADMISSION_MIN_CONCURRENCY = int(os.getenv('ADMISSION_MIN_CONCURRENCY', '1'))
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '64'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '30'))
+# With ADMISSION_ADAPTIVE the limit shrinks while LLM calls take longer than the target
+# and grows back while they are faster and the limit is saturated
+ADMISSION_ADAPTIVE = os.getenv('ADMISSION_ADAPTIVE', 'true').lower() == 'true'
+ADMISSION_TARGET_LATENCY = float(os.getenv('ADMISSION_TARGET_LATENCY', '60'))
+
+LATENCY_SMOOTHING = 0.2
+BACKOFF_FACTOR = 0.9
+
+
+class Overloaded(Exception):
+    """Raised when an LLM call is not admitted; retry_after is a hint in seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFull(Overloaded):
+    """The wait queue is at its configured length"""
+
+
+class DeadlineExceeded(Overloaded):
+    """The call could not finish before the caller's deadline"""
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue in front of the LLM backends"""
+
+    def __init__(self, max_concurrency: int = ADMISSION_MAX_CONCURRENCY, min_concurrency: int = ADMISSION_MIN_CONCURRENCY,
+                 max_queue: int = ADMISSION_MAX_QUEUE, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 adaptive: bool = ADMISSION_ADAPTIVE, target_latency: float = ADMISSION_TARGET_LATENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_backoff = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def capacity(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained"""
+        if not self.latency:
+            return 1
+        return max(1, math.ceil((len(self._waiters) + 1) * self.latency / self.capacity))
+
+    def _would_miss(self, deadline: Optional[float]) -> bool:
+        return deadline is not None and time.monotonic() + (self.latency or 0.0) > deadline
+
+    def _shed(self, message: str) -> DeadlineExceeded:
+        self.shed += 1
+        ADMISSION_REJECTIONS.labels('deadline').inc()
+        return DeadlineExceeded(message, self.retry_after())
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        ADMISSION_LIMIT.set(self.limit)
+
+    def _wake(self):
+        # Hand freed slots straight to waiters so newcomers cannot jump the queue
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._update_gauges()
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    async def _acquire(self, deadline: Optional[float], wait: bool = False):
+        if self._would_miss(deadline):
+            raise self._shed('Request would not finish before its deadline')
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            return
+        if not wait and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            ADMISSION_REJECTIONS.labels('queue_full').inc()
+            raise QueueFull(f'LLM queue is full ({self.max_queue} requests waiting)', self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        # Callers that wait are not bounded by the queue timeout, only by their deadline
+        timeout = None if wait else self.queue_timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic() - (self.latency or 0.0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            await asyncio.wait_for(waiter, None if timeout is None else max(timeout, 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up
+                self._release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                self._update_gauges()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            if deadline is not None and self._would_miss(deadline):
+                raise self._shed('Request would not finish before its deadline')
+            self.rejected += 1
+            ADMISSION_REJECTIONS.labels('queue_timeout').inc()
+            raise Overloaded(f'Waited {self.queue_timeout:g}s for an LLM slot', self.retry_after())
+
+        if self._would_miss(deadline):
+            self._release()
+            raise self._shed('Request would not finish before its deadline')
+
+    def _observe(self, elapsed: float, ok: bool):
+        self.latency = elapsed if self.latency is None else (
+            LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * self.latency
+        )
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if not ok or elapsed > self.target_latency:
+            # Multiplicative decrease, at most once per typical call so one burst of
+            # slow completions does not collapse the limit
+            if now - self._last_backoff >= (self.latency or 0.0):
+                self.limit = max(self.min_concurrency, self.limit * BACKOFF_FACTOR)
+                self._last_backoff = now
+        elif self.in_flight >= self.capacity:
+            # Additive increase: about +1 per limit's worth of fast completions
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None, wait: bool = False):
+        """Hold one LLM slot; deadline is a time.monotonic() timestamp
+
+        With wait the caller queues for as long as it takes, past ADMISSION_MAX_QUEUE
+        and ADMISSION_QUEUE_TIMEOUT; background jobs use it to absorb load rather than fail.
+        """
+        await self._acquire(deadline, wait)
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # The caller went away, which says nothing about the backends
+            raise
+        except BaseException:
+            self._observe(time.monotonic() - started, ok=False)
+            raise
+        else:
+            self._observe(time.monotonic() - started, ok=True)
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            'limit': round(self.limit, 2),
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'queued': len(self._waiters),
+            'max_queue': self.max_queue,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'shed': self.shed,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,281 @@
+"""
+Load-test harness for Resume Analyzer API
+Starts the API against SQLite (or --database-url) and the stub Ollama server, drives the
+upload, improve, get and list endpoints at a fixed concurrency and writes JSON results
+Usage: python bench/run_bench.py --concurrency 16 --requests 200 --out bench/results/run.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from synthetic_pdfs import make_resume_pdf
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+RESUME_TEXT = '''Jane Doe
+Software Engineer
+jane.doe@example.com | (555) 123-4567
+
+PROFESSIONAL SUMMARY
+Software engineer with experience in web development.
+
+WORK EXPERIENCE
+Software Developer - ABC Company
+- Worked on various projects
+- Fixed bugs in the billing service
+
+SKILLS
+Python, JavaScript, SQL, Docker
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app: str, port: int, env: dict, app_dir: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--app-dir', app_dir, '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'{url} exited with code {process.returncode}')
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout:g} seconds')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, duration: float, concurrency: int) -> dict:
+    ordered = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'concurrency': concurrency,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration else 0.0,
+        'latency_ms': {
+            'mean': to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+            'p50': to_ms(percentile(ordered, 0.50)),
+            'p95': to_ms(percentile(ordered, 0.95)),
+            'p99': to_ms(percentile(ordered, 0.99)),
+            'max': to_ms(ordered[-1]) if ordered else 0.0
+        }
+    }
+
+
+async def run_phase(name: str, count: int, concurrency: int,
+                    make_request: Callable[[int], Awaitable[httpx.Response]],
+                    expected_status: int = 200) -> dict:
+    """Issue count requests with at most concurrency in flight; latencies only for successes"""
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await make_request(index)
+                ok = response.status_code == expected_status
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(count)])
+    result = summarize(latencies, errors, time.perf_counter() - start, concurrency)
+    latency = result['latency_ms']
+    print(f'{name:<14} {result["throughput_rps"]:>9.1f} req/s  p50 {latency["p50"]:>8.1f} ms  '
+          f'p95 {latency["p95"]:>8.1f} ms  p99 {latency["p99"]:>8.1f} ms  errors {errors}')
+    return result
+
+
+async def run_benchmark(base_url: str, args) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        response = await client.post('/users/', json={
+            'username': 'bench', 'email': f'bench-{time.time_ns()}@example.com'
+        })
+        response.raise_for_status()
+        user_id = response.json()['id']
+
+        resume_ids: List[int] = []
+        # One PDF per request, built before the phase: identical bytes would only hit the upload dedupe
+        pdfs = [make_resume_pdf(args.pdf_pages, seed=index) for index in range(args.requests)]
+
+        async def upload_text(index: int) -> httpx.Response:
+            response = await client.post('/resumes/upload', data={
+                'user_id': str(user_id), 'text': f'{RESUME_TEXT}\nReference {index}'
+            })
+            if response.status_code == 201:
+                resume_ids.append(response.json()['id'])
+            return response
+
+        async def upload_pdf(index: int) -> httpx.Response:
+            return await client.post('/resumes/upload', data={'user_id': str(user_id)},
+                                     files={'file': (f'resume_{index}.pdf', pdfs[index], 'application/pdf')})
+
+        async def improve(index: int) -> httpx.Response:
+            return await client.post(f'/resumes/{resume_ids[index % len(resume_ids)]}/improve', json={
+                'job_description': 'Senior Python engineer with FastAPI and PostgreSQL',
+                'bypass_cache': not args.use_cache
+            })
+
+        async def get_resume(index: int) -> httpx.Response:
+            return await client.get(f'/resumes/{resume_ids[index % len(resume_ids)]}')
+
+        async def list_resumes(index: int) -> httpx.Response:
+            return await client.get(f'/users/{user_id}/resumes', params={'limit': args.page_size})
+
+        results = {}
+        results['upload_text'] = await run_phase('upload_text', args.requests, args.concurrency, upload_text, 201)
+        if not resume_ids:
+            raise RuntimeError('No resumes were uploaded; is the API healthy?')
+        results['upload_pdf'] = await run_phase('upload_pdf', args.requests, args.concurrency, upload_pdf, 201)
+        results['improve'] = await run_phase('improve', args.improve_requests, args.concurrency, improve)
+        results['get'] = await run_phase('get', args.requests, args.concurrency, get_resume)
+        results['list'] = await run_phase('list', args.requests, args.concurrency, list_resumes)
+        return results
+
+
+def compare(results: Dict[str, dict], baseline_path: str, max_regression: float) -> List[str]:
+    """Endpoints whose p95 latency grew by more than max_regression relative to a baseline run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = []
+    print(f'\nCompared with {baseline_path}:')
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['latency_ms']['p95']
+        after = result['latency_ms']['p95']
+        change = (after - before) / before if before else 0.0
+        print(f'{name:<14} p95 {before:>8.1f} -> {after:>8.1f} ms ({change:+.0%})')
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Resume Analyzer API against a stub Ollama server')
+    parser.add_argument('--database-url', help='Defaults to a fresh SQLite file in a temporary directory')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per upload, get and list phase')
+    parser.add_argument('--improve-requests', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--pdf-pages', type=int, default=3, help='Pages in the PDF used by upload_pdf')
+    parser.add_argument('--use-cache', action='store_true', help='Let improve requests hit the response cache')
+    parser.add_argument('--stub-latency', type=float, default=0.2)
+    parser.add_argument('--stub-tokens-per-second', type=float, default=50)
+    parser.add_argument('--stub-output-tokens', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--out', default=os.path.join(BENCH_DIR, 'results', f'bench-{datetime.now():%Y%m%d-%H%M%S}.json'))
+    parser.add_argument('--baseline', help='Earlier results JSON to compare p95 latency against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Fail if any p95 grows by more than this fraction of the baseline')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    database_url = args.database_url or f'sqlite:///{os.path.join(workdir, "bench.db")}'
+    stub_port, api_port = free_port(), free_port()
+    stub_url = f'http://127.0.0.1:{stub_port}'
+
+    stub = start_server('stub_ollama:app', stub_port, {
+        'STUB_LATENCY': str(args.stub_latency),
+        'STUB_TOKENS_PER_SECOND': str(args.stub_tokens_per_second),
+        'STUB_OUTPUT_TOKENS': str(args.stub_output_tokens)
+    }, BENCH_DIR)
+    api = start_server('main:app', api_port, {
+        'DATABASE_URL': database_url,
+        'APP_ENV': 'production',
+        'DB_ECHO': 'false',
+        'QWEN_API_URL': f'{stub_url}/api/generate',
+        'EMBEDDING_API_URL': f'{stub_url}/api/embeddings',
+        'EMBEDDING_INDEX_DIR': os.path.join(workdir, 'embeddings')
+    }, BACKEND_DIR)
+
+    try:
+        asyncio.run(wait_ready(f'{stub_url}/api/tags', stub))
+        asyncio.run(wait_ready(f'http://127.0.0.1:{api_port}/', api))
+        print(f'Benchmarking against {database_url.split("@")[-1]} at concurrency {args.concurrency}\n')
+        results = asyncio.run(run_benchmark(f'http://127.0.0.1:{api_port}', args))
+    finally:
+        for process in (api, stub):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': database_url.split('://')[0],
+        'config': {key: value for key, value in vars(args).items() if key not in ('out', 'baseline', 'database_url')},
+        'results': results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\n✓ Results written to {args.out}')
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f'✗ p95 regressed by more than {args.max_regression:.0%}: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Ollama-compatible stub for benchmarks: /api/generate (streaming or not) and embeddings
+with configurable latency and token rate
+Usage: STUB_LATENCY=0.2 STUB_TOKENS_PER_SECOND=50 uvicorn stub_ollama:app --app-dir bench --port 11500
+"""
+import os
+import json
+import time
+import zlib
+import random
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Stub configuration
+STUB_LATENCY = float(os.getenv('STUB_LATENCY', '0.2'))  # seconds before the first token (prompt eval)
+STUB_TOKENS_PER_SECOND = float(os.getenv('STUB_TOKENS_PER_SECOND', '50'))
+STUB_OUTPUT_TOKENS = int(os.getenv('STUB_OUTPUT_TOKENS', '200'))
+STUB_EMBEDDING_DIM = int(os.getenv('STUB_EMBEDDING_DIM', '384'))
+
+WORDS = (
+    'Led design and delivery of a high-throughput API, reducing p95 latency by 40% '
+    'and cutting infrastructure costs by $120K annually while mentoring four engineers.'
+).split()
+
+app = FastAPI(title='Stub Ollama')
+
+
+def _token(index: int) -> str:
+    return WORDS[index % len(WORDS)] + ('\n' if index % 16 == 15 else ' ')
+
+
+def _timings(prompt: str, tokens: int, context: list) -> dict:
+    # Like Ollama, a passed context is never re-evaluated and the returned one grows by the new tokens
+    prompt_tokens = max(1, len(prompt) // 4)
+    return {
+        'prompt_eval_count': prompt_tokens,
+        'prompt_eval_duration': int(STUB_LATENCY * 1e9),
+        'eval_count': tokens,
+        'eval_duration': int(tokens / STUB_TOKENS_PER_SECOND * 1e9),
+        'context': context + list(range(prompt_tokens + tokens))
+    }
+
+
+def _embedding(text: str) -> list:
+    rng = random.Random(zlib.crc32(text.encode('utf-8')))
+    return [rng.uniform(-1, 1) for _ in range(STUB_EMBEDDING_DIM)]
+
+
+@app.post('/api/generate')
+async def generate(request: Request):
+    body = await request.json()
+    prompt = body.get('prompt', '')
+    model = body.get('model', 'stub')
+    context = body.get('context') or []
+    tokens = min(STUB_OUTPUT_TOKENS, (body.get('options') or {}).get('num_predict', STUB_OUTPUT_TOKENS))
+
+    if not body.get('stream', True):
+        await asyncio.sleep(STUB_LATENCY + tokens / STUB_TOKENS_PER_SECOND)
+        return {
+            'model': model,
+            'response': ''.join(_token(i) for i in range(tokens)).strip(),
+            'done': True,
+            **_timings(prompt, tokens, context)
+        }
+
+    async def chunks():
+        await asyncio.sleep(STUB_LATENCY)
+        start = time.perf_counter()
+        for i in range(tokens):
+            # Sleep against a schedule so the rate holds even with coarse timers
+            delay = start + (i + 1) / STUB_TOKENS_PER_SECOND - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield json.dumps({'model': model, 'response': _token(i), 'done': False}) + '\n'
+        yield json.dumps({'model': model, 'response': '', 'done': True, **_timings(prompt, tokens, context)}) + '\n'
+
+    return StreamingResponse(chunks(), media_type='application/x-ndjson')
+
+
+@app.post('/api/embeddings')
+async def embeddings(request: Request):
+    body = await request.json()
+    return {'embedding': _embedding(body.get('prompt', ''))}
+
+
+@app.post('/api/embed')
+async def embed(request: Request):
+    body = await request.json()
+    inputs = body.get('input', [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    return {'model': body.get('model', 'stub'), 'embeddings': [_embedding(text) for text in inputs]}
+
+
+@app.get('/api/tags')
+def tags():
+    return {'models': [{'name': 'stub'}]}
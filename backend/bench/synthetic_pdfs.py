@@ -0,0 +1,96 @@
+"""
+Synthetic multi-page resume PDFs for extraction benchmarks
+Usage: python bench/synthetic_pdfs.py --out bench/pdfs --pages 1 2 5 10 25
+"""
+import os
+import random
+import argparse
+from typing import List
+
+SKILLS = [
+    'Python', 'FastAPI', 'PostgreSQL', 'Docker', 'Kubernetes', 'React', 'TypeScript', 'AWS', 'Terraform',
+    'Redis', 'Kafka', 'GraphQL', 'CI/CD', 'Linux', 'Go', 'Java', 'Spark', 'Airflow', 'Pandas', 'NumPy'
+]
+VERBS = ['Led', 'Built', 'Designed', 'Migrated', 'Automated', 'Reduced', 'Improved', 'Shipped', 'Owned', 'Scaled']
+OBJECTS = [
+    'the billing service', 'a data pipeline', 'the public API', 'an internal dashboard', 'the search backend',
+    'a payments integration', 'the deployment tooling', 'a reporting system', 'the mobile backend'
+]
+LINES_PER_PAGE = 48
+
+
+def resume_lines(rng: random.Random, count: int) -> List[str]:
+    """Plausible resume text: section headings followed by achievement bullets"""
+    lines = ['Jane Doe', 'Senior Software Engineer', 'jane.doe@example.com | (555) 123-4567', '']
+    sections = ['PROFESSIONAL SUMMARY', 'WORK EXPERIENCE', 'PROJECTS', 'SKILLS', 'EDUCATION']
+    while len(lines) < count:
+        lines.append(rng.choice(sections))
+        for _ in range(rng.randint(4, 10)):
+            lines.append(
+                f'- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} and '
+                f'{rng.choice(SKILLS)}, cutting latency by {rng.randint(5, 80)}%'
+            )
+        lines.append('')
+    return lines[:count]
+
+
+def _escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal PDF with one Helvetica text stream per page"""
+    count = len(pages)
+    font_id = 3 + 2 * count
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{" ".join(f"{3 + 2 * i} 0 R" for i in range(count))}] /Count {count} >>'
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>'
+        )
+        text = ''.join(f'({_escape(line)}) Tj T* ' for line in lines)
+        stream = f'BT /F1 10 Tf 15 TL 50 760 Td {text}ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('latin-1')
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    return bytes(out)
+
+
+def make_resume_pdf(page_count: int, seed: int = 0) -> bytes:
+    """Deterministic resume PDF with the given number of full pages"""
+    rng = random.Random(seed)
+    lines = resume_lines(rng, page_count * LINES_PER_PAGE)
+    return make_pdf([lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)])
+
+
+def write_pdfs(directory: str, page_counts: List[int]) -> List[str]:
+    """Write one PDF per page count and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for page_count in page_counts:
+        path = os.path.join(directory, f'resume_{page_count}p.pdf')
+        with open(path, 'wb') as f:
+            f.write(make_resume_pdf(page_count, seed=page_count))
+        paths.append(path)
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic multi-page resume PDFs')
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdfs'))
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 10, 25])
+    args = parser.parse_args()
+    for path in write_pdfs(args.out, args.pages):
+        print(f'✓ {path}')
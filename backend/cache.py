@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import LLMCacheEntry
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '3600'))
+# Persistent entries older than this many seconds are ignored (0 keeps them forever)
+LLM_CACHE_DB_TTL = float(os.getenv('LLM_CACHE_DB_TTL', '0'))
+
+
+def make_cache_key(prompt: str, model: str, options: dict) -> str:
+    """Content-address a generation by its prompt, model and options"""
+    digest = hashlib.sha256()
+    digest.update(model.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Two-tier LLM response cache: an in-process LRU in front of a database table"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL,
+                 db_ttl: float = LLM_CACHE_DB_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_ttl = db_ttl
+        self._entries = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _put_memory(self, key: str, response: str):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str, session: AsyncSession) -> Optional[str]:
+        """Look a key up in memory, then in the database"""
+        response = self._get_memory(key)
+        if response is not None:
+            self.memory_hits += 1
+            return response
+
+        entry = await session.get(LLMCacheEntry, key)
+        if entry and (not self.db_ttl or entry.created_at >= datetime.utcnow() - timedelta(seconds=self.db_ttl)):
+            self.db_hits += 1
+            self._put_memory(key, entry.response)
+            return entry.response
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, response: str, model: str, session: AsyncSession):
+        """Store a response in both tiers"""
+        self._put_memory(key, response)
+        try:
+            await session.merge(LLMCacheEntry(key=key, model=model, response=response))
+            await session.commit()
+        except SQLAlchemyError as e:
+            # A concurrent writer stored the same key first; the memory tier is enough
+            await session.rollback()
+            print(f'✗ Failed to persist LLM cache entry: {e}')
+
+    def clear(self):
+        """Drop the in-process tier"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.memory_hits + self.db_hits) / lookups if lookups else 0.0
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,75 @@
+import os
+import math
+from typing import List
+
+from dotenv import load_dotenv
+
+from sections import split_sections
+
+# Load environment variables
+load_dotenv()
+
+# Token budget configuration; QWEN_CONTEXT_TOKENS should match Ollama's num_ctx
+QWEN_CONTEXT_TOKENS = int(os.getenv('QWEN_CONTEXT_TOKENS', '8192'))
+# Expected output tokens per input resume token for a rewrite
+REWRITE_OUTPUT_RATIO = float(os.getenv('REWRITE_OUTPUT_RATIO', '1.3'))
+CHARS_PER_TOKEN = float(os.getenv('CHARS_PER_TOKEN', '3.5'))
+MIN_CHUNK_TOKENS = int(os.getenv('MIN_CHUNK_TOKENS', '256'))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; errs high for English text with Qwen's tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def fits_context(prompt: str, resume_text: str) -> bool:
+    """Whether a prompt plus the expected rewrite of resume_text fits the context window"""
+    needed = estimate_tokens(prompt) + estimate_tokens(resume_text) * REWRITE_OUTPUT_RATIO
+    return needed <= QWEN_CONTEXT_TOKENS
+
+
+def chunk_token_budget(overhead_tokens: int) -> int:
+    """Resume tokens per chunk once the fixed prompt and the chunk's output are accounted for"""
+    available = QWEN_CONTEXT_TOKENS - overhead_tokens
+    return max(MIN_CHUNK_TOKENS, int(available / (1 + REWRITE_OUTPUT_RATIO)))
+
+
+def _split_oversized(text: str, budget: int) -> List[str]:
+    # Paragraphs first, then lines, then a hard character split
+    for separator in ('\n\n', '\n'):
+        pieces = text.split(separator)
+        # Drop the empty piece a trailing separator leaves, so every part is
+        # strictly shorter than text and the recursion through _pack ends
+        parts = [part for part in [piece + separator for piece in pieces[:-1]] + pieces[-1:] if part]
+        if len(parts) > 1:
+            return _pack(parts, budget)
+    width = int(budget * CHARS_PER_TOKEN)
+    return [text[i:i + width] for i in range(0, len(text), width)]
+
+
+def _pack(parts: List[str], budget: int) -> List[str]:
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for part in parts:
+        tokens = estimate_tokens(part)
+        if tokens > budget:
+            if current:
+                chunks.append(''.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(part, budget))
+            continue
+        if current and current_tokens + tokens > budget:
+            chunks.append(''.join(current))
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += tokens
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def chunk_resume(resume_text: str, budget: int) -> List[str]:
+    """Split a resume into in-order chunks of whole sections under a token budget"""
+    chunks = _pack([section.text for section in split_sections(resume_text)], budget)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
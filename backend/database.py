@@ -1,35 +1,160 @@
 import os 
+import time
+import asyncio
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
+from metrics import DB_CHECKOUT_SECONDS, DB_CONNECTIONS_IN_USE
+
 # Load environment variables from .env file
 load_dotenv()
 
 DATABASE_URL = os.getenv('DATABASE_URL', 'postgresql://localhost:5432/resume_app')
 
-# Create engine with proper configuration
-engine = create_engine(
-    DATABASE_URL, 
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,
-    pool_recycle=300
+# Production profile turns SQL echo off unless DB_ECHO says otherwise
+APP_ENV = os.getenv('APP_ENV', 'development')
+DB_ECHO = os.getenv('DB_ECHO', 'false' if APP_ENV == 'production' else 'true').lower() == 'true'
+
+# Connection pool configuration; at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+# per process, and a request waits DB_POOL_TIMEOUT seconds for one before failing
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+# Server-side statement timeout in milliseconds (Postgres only, 0 disables)
+DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', '30000'))
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    scheme, separator, rest = url.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', to_async_url(DATABASE_URL))
+
+def engine_options(url: str) -> dict:
+    """Pool sizing and statement timeout for a sync or async engine URL"""
+    options = {'echo': DB_ECHO, 'pool_pre_ping': True, 'pool_recycle': 300}
+    if url.startswith('sqlite'):
+        return options
+    options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    if DB_STATEMENT_TIMEOUT:
+        if '+asyncpg' in url.split('://')[0]:
+            options['connect_args'] = {'server_settings': {'statement_timeout': str(DB_STATEMENT_TIMEOUT)}}
+        else:
+            options['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT}'}
+    return options
+
+# Sync engine for schema setup and scripts
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith('sqlite') and url.partition('://')[2] in ('', '/:memory:')
+
+# Async engine used by the API so database round-trips do not block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(ASYNC_DATABASE_URL),
+    # In-memory SQLite needs its single-connection pool
+    **({} if is_memory_sqlite(ASYNC_DATABASE_URL) else {'poolclass': TimedAsyncQueuePool})
 )
+if hasattr(async_engine.pool, 'checkedout'):
+    DB_CONNECTIONS_IN_USE.set_function(async_engine.pool.checkedout)
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Postgres text search configuration for the resume search column
+SEARCH_CONFIG = 'english'
 
 def create_db_and_tables():
     """Create all database tables"""
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+    # create_all only creates indexes together with new tables, so add any
+    # that are missing from tables created by an earlier version
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(engine, checkfirst=True)
+            except SQLAlchemyError as e:
+                print(f'✗ Could not create index {index.name}: {e}')
+    create_search_index()
     print("✓ Database tables created successfully")
 
+def add_missing_columns():
+    """Add nullable columns that tables created by an earlier version lack"""
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            # Quoted, since "user" is reserved in Postgres
+            preparer = engine.dialect.identifier_preparer
+            statement = (
+                f'ALTER TABLE {preparer.format_table(table)} '
+                f'ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}'
+            )
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(statement))
+                print(f'✓ Added column {table.name}.{column.name}')
+            except SQLAlchemyError as e:
+                print(f'✗ Could not add column {table.name}.{column.name}: {e}')
+
+def create_search_index():
+    """Add the maintained tsvector column and its GIN index (Postgres only)"""
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        conn.execute(text(f'''
+            ALTER TABLE resume ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('{SEARCH_CONFIG}', coalesce(original_text, '') || ' ' || coalesce(improved_text, ''))
+            ) STORED
+        '''))
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_resume_search_vector ON resume USING GIN (search_vector)'))
+
 def get_session():
     """Dependency for getting database sessions"""
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    """Dependency for getting async database sessions"""
+    async with async_session_maker() as session:
+        yield session
+
+async def ping_database(timeout: float = 2.0):
+    """One round-trip through the async pool; raises on failure or timeout"""
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+    await asyncio.wait_for(ping(), timeout)
+
 def test_connection():
     """Test database connection"""
     try: 
         with Session(engine) as session:
-            result = session.exec('SELECT 1').first()
+            session.exec(text('SELECT 1')).first()
             print('✓ Database connection successful')
             return True
     except Exception as e: 
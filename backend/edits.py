@@ -0,0 +1,100 @@
+import os
+import re
+import json
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from metrics import IMPROVEMENT_EDIT_FALLBACKS, IMPROVEMENT_OUTPUT_TOKENS, IMPROVEMENT_SECONDS
+
+# Load environment variables
+load_dotenv()
+
+# Default improvement output: 'rewrite' returns the whole resume, 'edits' only the changed lines
+IMPROVEMENT_OUTPUT_MODE = os.getenv('IMPROVEMENT_OUTPUT_MODE', 'rewrite')
+OUTPUT_MODES = ('rewrite', 'edits')
+
+_CODE_FENCE = re.compile(r'^```[a-z]*\s*|\s*```$', re.IGNORECASE)
+
+
+class EditParseError(Exception):
+    """Raised when an edit list is not valid JSON or references lines that do not exist"""
+
+
+def number_lines(text: str) -> str:
+    """Prefix every line with its 1-based number, as edit lists reference them"""
+    return '\n'.join(f'{number}| {line}' for number, line in enumerate(text.splitlines(), 1))
+
+
+def parse_edits(response: str, source: str) -> Dict[int, str]:
+    """Validated {line number: replacement} from the model's JSON edit list for source"""
+    line_count = len(source.splitlines())
+    body = _CODE_FENCE.sub('', response.strip())
+    start, end = body.find('['), body.rfind(']')
+    if start == -1 or end < start:
+        raise EditParseError('Response does not contain a JSON array')
+    try:
+        items = json.loads(body[start:end + 1])
+    except ValueError as e:
+        raise EditParseError(f'Invalid JSON: {e}') from e
+
+    edits: Dict[int, str] = {}
+    for item in items:
+        # bool is an int subclass, so {"line": true} must be rejected explicitly
+        line = item.get('line') if isinstance(item, dict) else None
+        if not isinstance(line, int) or isinstance(line, bool) or not isinstance(item.get('text'), str):
+            raise EditParseError(f'Malformed edit: {item!r}')
+        if not 1 <= line <= line_count:
+            raise EditParseError(f'Edit references line {line} of {line_count}')
+        if line in edits:
+            raise EditParseError(f'Line {line} is edited twice')
+        edits[line] = item['text']
+    return edits
+
+
+def apply_edits(source: str, edits: Dict[int, str]) -> str:
+    """Replace the edited lines of source; an empty replacement deletes the line"""
+    lines: List[str] = []
+    for number, line in enumerate(source.splitlines(), 1):
+        if number not in edits:
+            lines.append(line)
+        elif edits[number]:
+            lines.extend(edits[number].splitlines())
+    return '\n'.join(lines).strip()
+
+
+class OutputModeStats:
+    """Generated tokens and wall time of improvement LLM calls, by output mode"""
+
+    def __init__(self):
+        self.modes: Dict[str, Dict[str, float]] = {}
+        self.fallbacks = 0
+
+    def observe(self, mode: str, output_tokens: int, seconds: float):
+        stats = self.modes.setdefault(mode, {'generations': 0, 'output_tokens': 0, 'seconds': 0.0})
+        stats['generations'] += 1
+        stats['output_tokens'] += output_tokens
+        stats['seconds'] += seconds
+        IMPROVEMENT_OUTPUT_TOKENS.labels(mode).observe(output_tokens)
+        IMPROVEMENT_SECONDS.labels(mode).observe(seconds)
+
+    def fallback(self):
+        self.fallbacks += 1
+        IMPROVEMENT_EDIT_FALLBACKS.inc()
+
+    def stats(self) -> dict:
+        return {
+            'default_mode': IMPROVEMENT_OUTPUT_MODE,
+            'edit_fallbacks': self.fallbacks,
+            'modes': {
+                mode: {
+                    'generations': stats['generations'],
+                    'avg_output_tokens': round(stats['output_tokens'] / stats['generations'], 1),
+                    'avg_seconds': round(stats['seconds'] / stats['generations'], 3)
+                }
+                for mode, stats in self.modes.items()
+            }
+        }
+
+
+output_mode_stats = OutputModeStats()
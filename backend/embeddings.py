@@ -0,0 +1,245 @@
+import os
+import json
+import zlib
+import fcntl
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+from llm import LLMError, get_llm_client
+from scoring import tokenize
+
+# Load environment variables
+load_dotenv()
+
+# Embedding configuration
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'ollama')
+EMBEDDING_API_URL = os.getenv('EMBEDDING_API_URL', 'http://localhost:11434/api/embeddings')
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'nomic-embed-text')
+HASHING_EMBEDDING_DIM = int(os.getenv('HASHING_EMBEDDING_DIM', '384'))
+EMBEDDING_INDEX_DIR = os.getenv(
+    'EMBEDDING_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'embeddings')
+)
+# Rows scored per NumPy matmul when scanning the index
+SEARCH_BLOCK_ROWS = int(os.getenv('SEARCH_BLOCK_ROWS', '65536'))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1)).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Deterministic signed feature-hashing embedder for tests and offline use"""
+
+    def __init__(self, dim: int = HASHING_EMBEDDING_DIM):
+        self.dim = dim
+        self.model = f'hashing-{dim}'
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = zlib.crc32(token.encode('utf-8'))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        return normalize(vectors)
+
+
+class OllamaEmbedder:
+    """Embeddings from the local Ollama endpoint, through the shared LLM client"""
+
+    def __init__(self, url: str = EMBEDDING_API_URL, model: str = EMBEDDING_MODEL):
+        self.url = url
+        self.model = model
+
+    async def _embed_one(self, text: str) -> List[float]:
+        response = await get_llm_client().post(self.url, json={'model': self.model, 'prompt': text})
+        response.raise_for_status()
+        return response.json()['embedding']
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        try:
+            if self.url.rstrip('/').endswith('/api/embed'):
+                # Batch endpoint: one request for all texts
+                response = await get_llm_client().post(self.url, json={'model': self.model, 'input': list(texts)})
+                response.raise_for_status()
+                vectors = response.json()['embeddings']
+            else:
+                vectors = await asyncio.gather(*[self._embed_one(text) for text in texts])
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            raise LLMError(f'Error computing embeddings: {str(e) or e.__class__.__name__}') from e
+        return normalize(np.asarray(vectors, dtype=np.float32))
+
+
+class EmbeddingIndex:
+    """Append-only float32 matrix on disk, memory-mapped for brute-force top-k search"""
+
+    def __init__(self, directory: str = EMBEDDING_INDEX_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.dim: Optional[int] = None
+        self.model: Optional[str] = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors: Optional[np.ndarray] = None
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, 'meta.json')
+
+    @property
+    def _ids_path(self) -> str:
+        return os.path.join(self.directory, 'ids.i64')
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, 'vectors.f32')
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, 'append.lock')
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._ids)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock across processes, so appends from several workers never interleave"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim, self.model = meta['dim'], meta['model']
+
+    def _map(self):
+        # Vectors are written before ids, so the id file bounds the valid rows
+        rows = os.path.getsize(self._ids_path) // 8 if os.path.exists(self._ids_path) else 0
+        if rows and self.dim:
+            rows = min(rows, os.path.getsize(self._vectors_path) // (4 * self.dim))
+            self._ids = np.fromfile(self._ids_path, dtype=np.int64, count=rows)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        else:
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._vectors = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._read_meta()
+            self._map()
+            self._loaded = True
+
+    def _refresh(self):
+        """Re-map when another worker has appended rows since this process last mapped"""
+        rows = os.path.getsize(self._ids_path) // 8 if os.path.exists(self._ids_path) else 0
+        if rows == len(self._ids):
+            return
+        with self._lock:
+            if self.dim is None:
+                self._read_meta()
+            self._map()
+
+    def append(self, resume_ids: Sequence[int], vectors: np.ndarray, model: str):
+        """Add rows without touching existing ones"""
+        self._ensure_loaded()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            # Another worker may have created the index since it was loaded here
+            self._read_meta()
+            if self.dim is None:
+                self.dim, self.model = vectors.shape[1], model
+                with open(self._meta_path, 'w') as f:
+                    json.dump({'dim': self.dim, 'model': self.model}, f)
+            if vectors.shape[1] != self.dim or model != self.model:
+                raise ValueError(
+                    f'Index holds {self.dim}-dim vectors from {self.model}; '
+                    f'got {vectors.shape[1]}-dim vectors from {model}'
+                )
+            with open(self._vectors_path, 'ab') as f:
+                f.write(vectors.tobytes())
+            with open(self._ids_path, 'ab') as f:
+                f.write(np.asarray(resume_ids, dtype=np.int64).tobytes())
+            self._map()
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Top-k resume ids by cosine similarity, scanning the matrix block by block"""
+        self._ensure_loaded()
+        self._refresh()
+        ids, vectors = self._ids, self._vectors
+        if vectors is None or not len(ids) or k <= 0:
+            return []
+        query = normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        if query.shape[0] != self.dim:
+            raise ValueError(f'Query has {query.shape[0]} dimensions, index has {self.dim}')
+
+        # Over-fetch so a resume embedded more than once still leaves k distinct ids
+        fetch = min(len(ids), k * 2)
+        best_scores = np.full(0, -np.inf, dtype=np.float32)
+        best_rows = np.zeros(0, dtype=np.int64)
+        for start in range(0, len(ids), SEARCH_BLOCK_ROWS):
+            scores = vectors[start:start + SEARCH_BLOCK_ROWS] @ query
+            if len(scores) > fetch:
+                top = np.argpartition(scores, -fetch)[-fetch:]
+            else:
+                top = np.arange(len(scores))
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+            if len(best_scores) > fetch:
+                keep = np.argpartition(best_scores, -fetch)[-fetch:]
+                best_scores, best_rows = best_scores[keep], best_rows[keep]
+
+        order = np.lexsort((-best_rows, -best_scores))
+        results: List[Tuple[int, float]] = []
+        seen = set()
+        for position in order:
+            resume_id = int(ids[best_rows[position]])
+            if resume_id in seen:
+                continue
+            seen.add(resume_id)
+            results.append((resume_id, float(best_scores[position])))
+            if len(results) == k:
+                break
+        return results
+
+
+def get_embedder():
+    if EMBEDDING_BACKEND == 'hashing':
+        return HashingEmbedder()
+    return OllamaEmbedder()
+
+
+embedder = get_embedder()
+embedding_index = EmbeddingIndex()
+
+
+async def index_embeddings(resume_ids: Sequence[int], texts: Sequence[str]):
+    """Embed resumes and append them to the index"""
+    if not resume_ids:
+        return
+    vectors = await embedder.embed(texts)
+    await asyncio.to_thread(embedding_index.append, resume_ids, vectors, embedder.model)
+
+
+async def semantic_search(query: str, k: int) -> List[Tuple[int, float]]:
+    """Top-k resumes for a free-text query"""
+    vector = (await embedder.embed([query]))[0]
+    # The scan is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(embedding_index.search, vector, k)
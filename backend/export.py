@@ -0,0 +1,49 @@
+import os
+import zlib
+from typing import AsyncIterator
+
+import orjson
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from database import async_session_maker
+from models import Resume
+
+# Load environment variables
+load_dotenv()
+
+# Export configuration; rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+# 1 (fastest) to 9 (smallest); gzip output is flushed after every batch
+EXPORT_GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', '6'))
+
+EXPORT_COLUMNS = (Resume.id, Resume.user_id, Resume.original_text, Resume.improved_text, Resume.created_at)
+
+
+async def iter_resume_batches(user_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """NDJSON for a user's resumes, one chunk per batch of rows from a server-side cursor"""
+    # Plain column rows rather than ORM objects, so nothing accumulates in the identity map
+    statement = (
+        select(*EXPORT_COLUMNS)
+        .where(Resume.user_id == user_id)
+        .order_by(Resume.created_at, Resume.id)
+        .execution_options(yield_per=batch_size)
+    )
+    # Its own session: the request's session is closed before a streamed body finishes
+    async with async_session_maker() as session:
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            yield b''.join(orjson.dumps(dict(row._mapping)) + b'\n' for row in rows)
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member, flushing after each chunk so it can be sent"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_user_resumes(user_id: int, compress: bool = False) -> AsyncIterator[bytes]:
+    chunks = iter_resume_batches(user_id)
+    return gzip_chunks(chunks) if compress else chunks
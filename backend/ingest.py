@@ -0,0 +1,185 @@
+import os
+import json
+import asyncio
+import zipfile
+from datetime import datetime
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Resume
+from sections import parse_resume
+
+# Load environment variables
+load_dotenv()
+
+# Bulk ingestion configuration
+BULK_MAX_FILES = int(os.getenv('BULK_MAX_FILES', '10000'))
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', '500'))
+BULK_EXTRACT_CONCURRENCY = int(os.getenv('BULK_EXTRACT_CONCURRENCY', '16'))
+BULK_MAX_MEMBER_BYTES = int(os.getenv('BULK_MAX_MEMBER_BYTES', str(10 * 1024 * 1024)))
+# NDJSON is read this many bytes of whole lines at a time
+BULK_NDJSON_READ_BYTES = int(os.getenv('BULK_NDJSON_READ_BYTES', str(1024 * 1024)))
+
+T = TypeVar('T')
+
+
+class IngestError(Exception):
+    """Raised for a bulk item that cannot be turned into resume text"""
+
+
+@dataclass
+class BulkItem:
+    """One resume in a bulk upload; load() returns raw PDF bytes or text"""
+    name: str
+    kind: str
+    load: Callable[[], Awaitable[object]]
+
+
+def _kind_for(name: str, content_type: Optional[str] = None) -> Optional[str]:
+    lowered = name.lower()
+    if lowered.endswith('.pdf') or content_type == 'application/pdf':
+        return 'pdf'
+    if lowered.endswith('.zip') or content_type in ('application/zip', 'application/x-zip-compressed'):
+        return 'zip'
+    if lowered.endswith(('.ndjson', '.jsonl')) or content_type == 'application/x-ndjson':
+        return 'ndjson'
+    if lowered.endswith('.txt') or content_type == 'text/plain':
+        return 'text'
+    return None
+
+
+async def _zip_items(archive: zipfile.ZipFile, archive_name: str) -> AsyncIterator[BulkItem]:
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        kind = _kind_for(info.filename)
+        if kind not in ('pdf', 'text'):
+            continue
+
+        async def load(info=info, kind=kind):
+            if info.file_size > BULK_MAX_MEMBER_BYTES:
+                raise IngestError(f'File is larger than {BULK_MAX_MEMBER_BYTES} bytes')
+            # Decompression is blocking file I/O and CPU work
+            data = await asyncio.to_thread(archive.read, info)
+            return data if kind == 'pdf' else data.decode('utf-8', errors='replace')
+
+        yield BulkItem(name=f'{archive_name}/{info.filename}', kind=kind, load=load)
+
+
+async def _ndjson_items(file: UploadFile) -> AsyncIterator[BulkItem]:
+    line_number = 0
+    await file.seek(0)
+    while True:
+        # A block of whole lines at a time, read off the event loop
+        lines = await asyncio.to_thread(file.file.readlines, BULK_NDJSON_READ_BYTES)
+        if not lines:
+            return
+        for raw_line in lines:
+            line_number += 1
+            if not raw_line.strip():
+                continue
+            try:
+                record = json.loads(raw_line)
+                text = record.get('text')
+                name = record.get('name')
+            except (ValueError, AttributeError):
+                text = name = None
+            name = name or f'{file.filename}:{line_number}'
+
+            async def load(text=text, line_number=line_number):
+                if not text:
+                    raise IngestError(f'Line {line_number} is not a JSON object with a "text" field')
+                return text
+
+            yield BulkItem(name=name, kind='text', load=load)
+
+
+async def _file_items(file: UploadFile, name: str, kind: str) -> AsyncIterator[BulkItem]:
+    async def load():
+        await file.seek(0)
+        data = await file.read()
+        return data if kind == 'pdf' else data.decode('utf-8', errors='replace')
+
+    yield BulkItem(name=name, kind=kind, load=load)
+
+
+async def open_uploads(files: List[UploadFile]) -> List[Tuple[UploadFile, str, Optional[zipfile.ZipFile]]]:
+    """Check every upload's type and open ZIP archives, before any result is streamed"""
+    uploads = []
+    for file in files:
+        name = file.filename or 'upload'
+        kind = _kind_for(name, file.content_type)
+        if kind is None:
+            raise IngestError(f'{name}: unsupported file type, expected PDF, ZIP, NDJSON or text')
+        archive = None
+        if kind == 'zip':
+            try:
+                archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+            except zipfile.BadZipFile as e:
+                raise IngestError(f'{name}: {e}')
+        uploads.append((file, kind, archive))
+    return uploads
+
+
+async def expand_uploads(uploads: List[Tuple[UploadFile, str, Optional[zipfile.ZipFile]]]) -> AsyncIterator[BulkItem]:
+    """Flatten PDFs, ZIP archives and NDJSON files into individual resumes, lazily"""
+    count = 0
+    for file, kind, archive in uploads:
+        name = file.filename or 'upload'
+        if kind == 'zip':
+            items = _zip_items(archive, name)
+        elif kind == 'ndjson':
+            items = _ndjson_items(file)
+        else:
+            items = _file_items(file, name, kind)
+
+        async for item in items:
+            count += 1
+            if count > BULK_MAX_FILES:
+                raise IngestError(f'Too many resumes in one request, the limit is {BULK_MAX_FILES}')
+            yield item
+
+
+async def map_bounded(items: AsyncIterator[BulkItem], fn: Callable[[BulkItem], Awaitable[T]],
+                      concurrency: int) -> AsyncIterator[T]:
+    """Results of fn over items in completion order, pulling items only as slots free up"""
+    pending = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.create_task(fn(item)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def insert_resumes(session: AsyncSession, user_id: int, texts: List[str]) -> List[int]:
+    """Insert a batch of resumes with one multi-row statement and one commit"""
+    if not texts:
+        return []
+    created_at = datetime.utcnow()
+    rows: List[Dict] = []
+    for text in texts:
+        sections, contact = parse_resume(text)
+        rows.append({'user_id': user_id, 'original_text': text, 'sections': sections, 'contact': contact,
+                     'created_at': created_at})
+    statement = insert(Resume).returning(Resume.id, sort_by_parameter_order=True)
+    ids = list((await session.execute(statement, rows)).scalars())
+    await session.commit()
+    return ids
@@ -0,0 +1,168 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import or_, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import async_session_maker
+from models import ImprovementJob
+
+# Load environment variables
+load_dotenv()
+
+# Job queue configuration
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', '100'))
+# A running job's worker renews its lease every third of this; a job whose lease
+# has lapsed belonged to a process that died and is run again on the next start
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '120'))
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+JobHandler = Callable[[ImprovementJob, AsyncSession], Awaitable[str]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its configured depth"""
+
+
+class JobQueue:
+    """Database-backed job queue drained by a fixed pool of asyncio workers"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_depth: int = JOB_QUEUE_MAX_DEPTH):
+        self.workers = workers
+        self.max_depth = max_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._handler: Optional[JobHandler] = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self, handler: JobHandler):
+        """Re-queue unfinished jobs from the database and start the workers"""
+        self._handler = handler
+        self._queue = asyncio.Queue()
+
+        stale = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+        async with async_session_maker() as session:
+            # Only running jobs with a lapsed lease start over; other live
+            # processes keep renewing the leases of the jobs they are running
+            recovered = await session.execute(
+                update(ImprovementJob)
+                .where(
+                    ImprovementJob.status == JOB_RUNNING,
+                    or_(ImprovementJob.heartbeat_at.is_(None), ImprovementJob.heartbeat_at < stale)
+                )
+                .values(status=JOB_QUEUED)
+            )
+            await session.commit()
+            statement = select(ImprovementJob.id).where(ImprovementJob.status == JOB_QUEUED).order_by(ImprovementJob.id)
+            pending = (await session.exec(statement)).all()
+
+        # Queued jobs may also sit in another process's queue; the claim in _run
+        # makes sure only one of them runs each job
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            print(f'✓ Re-queued {len(pending)} unfinished improvement jobs ({recovered.rowcount} with a lapsed lease)')
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs are picked up again on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def check_capacity(self):
+        """Raise QueueFullError if another job cannot be accepted"""
+        if self._queue is None:
+            raise QueueFullError('Job queue is not running')
+        if self._queue.qsize() >= self.max_depth:
+            raise QueueFullError(f'Job queue is full ({self.max_depth} jobs waiting)')
+
+    def enqueue(self, job_id: int):
+        """Hand a persisted job to the workers
+
+        Capacity is checked before the job is committed, not here: a job row
+        that already exists must reach the workers even if the queue filled
+        up in the meantime, or it would sit 'queued' until the next restart.
+        """
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f'✗ Improvement job {job_id} crashed: {e}')
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, session: AsyncSession, job_id: int) -> bool:
+        """Move a queued job to running; False if another worker or process claimed it first"""
+        now = datetime.utcnow()
+        result = await session.execute(
+            update(ImprovementJob)
+            .where(ImprovementJob.id == job_id, ImprovementJob.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=now, heartbeat_at=now, attempts=ImprovementJob.attempts + 1)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    async def _heartbeat(self, job_id: int):
+        """Renew a running job's lease until cancelled"""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(
+                        update(ImprovementJob)
+                        .where(ImprovementJob.id == job_id, ImprovementJob.status == JOB_RUNNING)
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    await session.commit()
+            except Exception as e:
+                print(f'✗ Failed to renew the lease of improvement job {job_id}: {e}')
+
+    async def _run(self, job_id: int):
+        async with async_session_maker() as session:
+            if not await self._claim(session, job_id):
+                return
+            job = await session.get(ImprovementJob, job_id)
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                job.result = await self._handler(job, session)
+                job.status = JOB_SUCCEEDED
+            except Exception as e:
+                await session.rollback()
+                job.status = JOB_FAILED
+                job.error = str(getattr(e, 'detail', e))
+            finally:
+                heartbeat.cancel()
+
+            job.finished_at = datetime.utcnow()
+            session.add(job)
+            await session.commit()
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'depth': self.depth,
+            'max_depth': self.max_depth
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,171 @@
+import os
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from database import async_session_maker
+from models import ResumeContext
+from llm import QWEN_MODEL, generate
+from chunking import estimate_tokens
+from singleflight import SingleFlight
+from metrics import LLM_CONTEXT_REQUESTS, LLM_PROMPT_EVAL_SECONDS_SAVED, LLM_PROMPT_EVAL_TOKENS_SAVED
+
+# Load environment variables
+load_dotenv()
+
+# KV context reuse; prefixes shorter than LLM_CONTEXT_MIN_PREFIX_CHARS are cheaper
+# to re-send than to prime and store
+LLM_CONTEXT_REUSE = os.getenv('LLM_CONTEXT_REUSE', 'true').lower() == 'true'
+LLM_CONTEXT_MIN_PREFIX_CHARS = int(os.getenv('LLM_CONTEXT_MIN_PREFIX_CHARS', '1500'))
+# Stored contexts older than this are primed again, and deleted when any prefix is primed
+LLM_CONTEXT_TTL = float(os.getenv('LLM_CONTEXT_TTL', str(24 * 3600)))
+
+# The priming turn evaluates the prefix and asks for a one-word acknowledgement
+PRIME_INSTRUCTION = '\nReply with READY only. The improvement instructions follow in the next message.'
+PRIME_OPTIONS = {'num_predict': 4}
+
+
+def hash_prefix(prefix: str) -> str:
+    return hashlib.sha256(f'{QWEN_MODEL}\0{prefix}'.encode('utf-8')).hexdigest()
+
+
+class ContextStats:
+    """Counters for primed and reused contexts and the prompt evaluation they saved"""
+
+    def __init__(self):
+        self.deferred = 0
+        self.primed = 0
+        self.reused = 0
+        self.tokens_saved = 0
+        self.seconds_saved = 0.0
+
+    def stats(self) -> dict:
+        return {
+            'enabled': LLM_CONTEXT_REUSE,
+            'deferred': self.deferred,
+            'primed': self.primed,
+            'reused': self.reused,
+            'prompt_eval_tokens_saved': self.tokens_saved,
+            'prompt_eval_seconds_saved': round(self.seconds_saved, 3)
+        }
+
+
+context_stats = ContextStats()
+prime_flight = SingleFlight()
+
+
+def should_reuse(prefix: str) -> bool:
+    return LLM_CONTEXT_REUSE and len(prefix) >= LLM_CONTEXT_MIN_PREFIX_CHARS
+
+
+def is_fresh(entry: ResumeContext) -> bool:
+    return bool(entry.context) and entry.created_at >= datetime.utcnow() - timedelta(seconds=LLM_CONTEXT_TTL)
+
+
+async def _load(resume_id: int, prefix_hash: str) -> Optional[ResumeContext]:
+    async with async_session_maker() as session:
+        statement = select(ResumeContext).where(
+            ResumeContext.resume_id == resume_id,
+            ResumeContext.prefix_hash == prefix_hash
+        )
+        return (await session.exec(statement)).first()
+
+
+async def _mark_seen(resume_id: int, prefix_hash: str):
+    """Record a prefix's first use as a row without a context, so a second use primes it"""
+    context_stats.deferred += 1
+    LLM_CONTEXT_REQUESTS.labels('deferred').inc()
+    async with async_session_maker() as session:
+        session.add(ResumeContext(resume_id=resume_id, prefix_hash=prefix_hash, model=QWEN_MODEL))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another worker saw the same prefix first
+            await session.rollback()
+
+
+async def _prime(resume_id: int, prefix: str, prefix_hash: str) -> ResumeContext:
+    """Evaluate the prefix once and store the context Ollama returns for it"""
+    body = await generate(prefix + PRIME_INSTRUCTION, options=PRIME_OPTIONS)
+    context_stats.primed += 1
+    LLM_CONTEXT_REQUESTS.labels('primed').inc()
+    async with async_session_maker() as session:
+        statement = select(ResumeContext).where(
+            ResumeContext.resume_id == resume_id,
+            ResumeContext.prefix_hash == prefix_hash
+        )
+        entry = (await session.exec(statement)).first() or ResumeContext(
+            resume_id=resume_id, prefix_hash=prefix_hash, model=QWEN_MODEL
+        )
+        entry.context = body.get('context') or []
+        entry.backend = body.get('backend')
+        entry.prompt_eval_count = body.get('prompt_eval_count') or 0
+        entry.prompt_eval_seconds = (body.get('prompt_eval_duration') or 0) / 1e9
+        entry.created_at = datetime.utcnow()
+        session.add(entry)
+        # Contexts for an old original_text or job description never match again
+        # and the backends have long dropped them, so expired rows go
+        cutoff = datetime.utcnow() - timedelta(seconds=LLM_CONTEXT_TTL)
+        await session.execute(delete(ResumeContext).where(ResumeContext.created_at < cutoff))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another worker primed the same prefix; either context is as good
+            await session.rollback()
+    return entry
+
+
+async def get_context(resume_id: int, prefix: str, prime: bool = True) -> Optional[ResumeContext]:
+    """Stored context for a resume's prompt prefix, priming it the second time the prefix is used
+
+    Priming costs an extra LLM call, which only pays off for a prefix that comes
+    back; one-off improvements send the whole prompt. prime=False only reuses a
+    context that is already stored.
+    """
+    prefix_hash = hash_prefix(prefix)
+    entry = await _load(resume_id, prefix_hash)
+    if entry is not None and is_fresh(entry):
+        return entry
+    if not prime:
+        return None
+    if entry is None:
+        await _mark_seen(resume_id, prefix_hash)
+        return None
+    # Concurrent focuses on the same resume share one priming call
+    key = f'{resume_id}:{prefix_hash}'
+    entry, _ = await prime_flight.do(key, lambda: _prime(resume_id, prefix, prefix_hash))
+    return entry if entry.context else None
+
+
+def record_reuse(entry: ResumeContext, body: dict, suffix: str):
+    """Estimate the prefix evaluation a generation skipped by continuing from entry's context
+
+    Ollama's prompt_eval_count only counts tokens it actually evaluated, so the
+    prefix tokens it found in its KV cache are those missing from that count.
+    """
+    context_stats.reused += 1
+    LLM_CONTEXT_REQUESTS.labels('reused').inc()
+    evaluated = body.get('prompt_eval_count')
+    if evaluated is None or not entry.prompt_eval_count:
+        return
+    tokens = min(len(entry.context), max(0, len(entry.context) + estimate_tokens(suffix) - evaluated))
+    seconds = tokens * entry.prompt_eval_seconds / entry.prompt_eval_count
+    context_stats.tokens_saved += tokens
+    context_stats.seconds_saved += seconds
+    LLM_PROMPT_EVAL_TOKENS_SAVED.inc(tokens)
+    LLM_PROMPT_EVAL_SECONDS_SAVED.inc(seconds)
+
+
+async def generate_with_context(resume_id: int, prefix: str, suffix: str, prime: bool = True) -> dict:
+    """Generate for prefix + suffix, sending only the suffix when the prefix's context is stored"""
+    entry = await get_context(resume_id, prefix, prime) if should_reuse(prefix) else None
+    if entry is None:
+        return await generate(prefix + suffix)
+    body = await generate(suffix, context=entry.context, prefer=entry.backend)
+    record_reuse(entry, body, suffix)
+    return body
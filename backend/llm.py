@@ -0,0 +1,147 @@
+import os
+import json
+import time
+from typing import AsyncIterator, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from llm_router import LLMRouter, NoBackendAvailable, parse_backends
+from metrics import LLM_REQUEST_SECONDS, observe_llm_response
+
+# Load environment variables
+load_dotenv()
+
+# Qwen configuration
+QWEN_API_URL = os.getenv('QWEN_API_URL', 'http://localhost:11434/api/generate')
+QWEN_MODEL = os.getenv('QWEN_MODEL', 'qwen2.5:7b-instruct')
+# Pool of Ollama generate URLs, comma-separated, each optionally suffixed with
+# |max_concurrency; defaults to QWEN_API_URL alone
+QWEN_API_URLS = os.getenv('QWEN_API_URLS', QWEN_API_URL)
+# Ollama generation options (temperature, num_ctx, ...) as a JSON object
+QWEN_OPTIONS = json.loads(os.getenv('QWEN_OPTIONS', '{}'))
+# How long Ollama keeps the model loaded after a request: a duration such as '30m',
+# seconds (-1 keeps it loaded forever) or '' for Ollama's own default
+_keep_alive = os.getenv('QWEN_KEEP_ALIVE', '30m')
+QWEN_KEEP_ALIVE = int(_keep_alive) if _keep_alive.lstrip('-').isdigit() else _keep_alive
+
+# HTTP client configuration
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '120'))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '256'))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', '64'))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv('LLM_KEEPALIVE_EXPIRY', '60'))
+
+# Backend pool configuration; the cap should match each node's OLLAMA_NUM_PARALLEL
+LLM_BACKEND_MAX_CONCURRENCY = int(os.getenv('LLM_BACKEND_MAX_CONCURRENCY', '4'))
+LLM_HEALTH_CHECK_INTERVAL = float(os.getenv('LLM_HEALTH_CHECK_INTERVAL', '10'))
+LLM_EJECT_AFTER_FAILURES = int(os.getenv('LLM_EJECT_AFTER_FAILURES', '3'))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class LLMError(Exception):
+    """Raised when the LLM backend cannot produce a response"""
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+            )
+        )
+    return _client
+
+
+llm_router = LLMRouter(
+    parse_backends(QWEN_API_URLS, LLM_BACKEND_MAX_CONCURRENCY),
+    lambda: get_llm_client(),
+    eject_after=LLM_EJECT_AFTER_FAILURES,
+    health_interval=LLM_HEALTH_CHECK_INTERVAL,
+    health_timeout=LLM_CONNECT_TIMEOUT
+)
+
+
+async def close_llm_client():
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def load_model(url: str) -> dict:
+    """Ask one Ollama node to load QWEN_MODEL (a request without a prompt) and keep it resident"""
+    payload = {'model': QWEN_MODEL, 'stream': False}
+    if QWEN_KEEP_ALIVE != '':
+        payload['keep_alive'] = QWEN_KEEP_ALIVE
+    try:
+        response = await get_llm_client().post(url, json=payload)
+        response.raise_for_status()
+        return response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise LLMError(str(e) or e.__class__.__name__) from e
+
+
+def build_payload(prompt: str, stream: bool, context: Optional[List[int]] = None,
+                  options: Optional[dict] = None) -> dict:
+    """Ollama generate request; context continues from the tokens of an earlier response"""
+    payload = {
+        'model': QWEN_MODEL,
+        'prompt': prompt,
+        'stream': stream
+    }
+    if QWEN_OPTIONS or options:
+        payload['options'] = {**QWEN_OPTIONS, **(options or {})}
+    if QWEN_KEEP_ALIVE != '':
+        payload['keep_alive'] = QWEN_KEEP_ALIVE
+    if context:
+        payload['context'] = context
+    return payload
+
+
+async def generate(prompt: str, context: Optional[List[int]] = None, options: Optional[dict] = None,
+                   prefer: Optional[str] = None) -> dict:
+    """Run a non-streaming generation and return Ollama's JSON body plus the serving backend's URL"""
+    payload = build_payload(prompt, False, context, options)
+    start = time.perf_counter()
+    try:
+        response = await llm_router.post(payload, prefer)
+        body = response.json()
+    except (httpx.HTTPError, ValueError, NoBackendAvailable) as e:
+        LLM_REQUEST_SECONDS.labels('generate', 'error').observe(time.perf_counter() - start)
+        raise LLMError(str(e) or e.__class__.__name__) from e
+    LLM_REQUEST_SECONDS.labels('generate', 'success').observe(time.perf_counter() - start)
+    observe_llm_response(body)
+    body['backend'] = str(response.request.url)
+    return body
+
+
+async def stream_generate(prompt: str, context: Optional[List[int]] = None,
+                          prefer: Optional[str] = None) -> AsyncIterator[dict]:
+    """Yield Ollama's NDJSON chunks as they arrive from a streaming generation"""
+    payload = build_payload(prompt, True, context)
+    start = time.perf_counter()
+    outcome = 'cancelled'
+    try:
+        # Leaving this context (including on cancellation) closes the upstream
+        # connection, which makes Ollama abort the generation
+        async with llm_router.stream(payload, prefer) as response:
+            async for line in response.aiter_lines():
+                if line.strip():
+                    chunk = json.loads(line)
+                    if chunk.get('done'):
+                        outcome = 'success'
+                        observe_llm_response(chunk)
+                    yield chunk
+    except (httpx.HTTPError, ValueError, NoBackendAvailable) as e:
+        outcome = 'error'
+        raise LLMError(str(e) or e.__class__.__name__) from e
+    finally:
+        LLM_REQUEST_SECONDS.labels('stream', outcome).observe(time.perf_counter() - start)
@@ -0,0 +1,223 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+from metrics import LLM_BACKEND_HEALTHY, LLM_BACKEND_OUTSTANDING, LLM_BACKEND_REQUEST_SECONDS, LLM_BACKEND_REQUESTS
+
+# Errors that mean the request never reached the model, so another node can safely take it
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+LATENCY_SMOOTHING = 0.2
+
+
+class NoBackendAvailable(Exception):
+    """Raised when every LLM backend is ejected or has already failed this request"""
+
+
+class Backend:
+    """One Ollama node: its generate URL, concurrency cap and live counters"""
+
+    def __init__(self, url: str, max_concurrency: int):
+        self.url = url
+        parts = urlsplit(url)
+        self.health_url = f'{parts.scheme}://{parts.netloc}/api/tags'
+        self.max_concurrency = max_concurrency
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        LLM_BACKEND_HEALTHY.labels(url).set(1)
+
+    @property
+    def load(self) -> float:
+        return self.outstanding / self.max_concurrency
+
+    def stats(self) -> dict:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'max_concurrency': self.max_concurrency,
+            'requests': self.requests,
+            'failures': self.failures,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'last_error': self.last_error
+        }
+
+
+def parse_backends(spec: str, default_concurrency: int) -> List[Backend]:
+    """Comma-separated generate URLs, each optionally suffixed with |max_concurrency"""
+    backends = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, concurrency = entry.partition('|')
+        backends.append(Backend(url.strip(), int(concurrency) if concurrency else default_concurrency))
+    return backends
+
+
+class LLMRouter:
+    """Least-outstanding-requests routing over Ollama nodes with health checks and failover"""
+
+    def __init__(self, backends: List[Backend], client_factory: Callable[[], httpx.AsyncClient],
+                 eject_after: int = 3, health_interval: float = 10, health_timeout: float = 5):
+        self.backends = backends
+        self.client_factory = client_factory
+        self.eject_after = eject_after
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.retries = 0
+        self._slots = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.health_interval > 0:
+            self._task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _pick(self, exclude: Set[str], prefer: Optional[str] = None) -> Optional[Backend]:
+        candidates = [
+            backend for backend in self.backends
+            if backend.healthy and backend.url not in exclude and backend.outstanding < backend.max_concurrency
+        ]
+        if not candidates:
+            return None
+        # A node that already holds the request's KV context wins while it has a free slot
+        for backend in candidates:
+            if backend.url == prefer:
+                return backend
+        # Least loaded first; observed latency breaks ties between equally loaded nodes
+        return min(candidates, key=lambda backend: (backend.load, backend.latency or 0.0))
+
+    async def acquire(self, exclude: Set[str], prefer: Optional[str] = None) -> Backend:
+        """Reserve a slot on the preferred or least-loaded healthy node, waiting while all are at their cap"""
+        async with self._slots:
+            while True:
+                if not any(backend.healthy and backend.url not in exclude for backend in self.backends):
+                    raise NoBackendAvailable('No healthy LLM backend is available')
+                backend = self._pick(exclude, prefer)
+                if backend:
+                    backend.outstanding += 1
+                    LLM_BACKEND_OUTSTANDING.labels(backend.url).set(backend.outstanding)
+                    return backend
+                await self._slots.wait()
+
+    async def release(self, backend: Backend, started: float, error: Optional[BaseException] = None):
+        elapsed = time.perf_counter() - started
+        backend.outstanding -= 1
+        backend.requests += 1
+        LLM_BACKEND_OUTSTANDING.labels(backend.url).set(backend.outstanding)
+        LLM_BACKEND_REQUEST_SECONDS.labels(backend.url).observe(elapsed)
+        if error is None:
+            LLM_BACKEND_REQUESTS.labels(backend.url, 'success').inc()
+            backend.consecutive_failures = 0
+            backend.latency = elapsed if backend.latency is None else (
+                LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * backend.latency
+            )
+        elif not isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            LLM_BACKEND_REQUESTS.labels(backend.url, 'error').inc()
+            self._record_failure(backend, error, eject=isinstance(error, RETRYABLE_ERRORS))
+        async with self._slots:
+            self._slots.notify_all()
+
+    def _record_failure(self, backend: Backend, error: BaseException, eject: bool = False):
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        backend.last_error = str(error) or error.__class__.__name__
+        if backend.healthy and (eject or backend.consecutive_failures >= self.eject_after):
+            backend.healthy = False
+            LLM_BACKEND_HEALTHY.labels(backend.url).set(0)
+            print(f'✗ Ejected LLM backend {backend.url}: {backend.last_error}')
+
+    async def _mark_healthy(self, backend: Backend):
+        backend.consecutive_failures = 0
+        if not backend.healthy:
+            backend.healthy = True
+            LLM_BACKEND_HEALTHY.labels(backend.url).set(1)
+            print(f'✓ LLM backend {backend.url} is back')
+            async with self._slots:
+                self._slots.notify_all()
+
+    async def check(self, backend: Backend):
+        """Probe one node's API; ejects it after repeated failures and restores it on success"""
+        try:
+            response = await self.client_factory().get(backend.health_url, timeout=self.health_timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self._record_failure(backend, e, eject=isinstance(e, RETRYABLE_ERRORS))
+            return
+        await self._mark_healthy(backend)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*[self.check(backend) for backend in self.backends])
+            await asyncio.sleep(self.health_interval)
+
+    async def post(self, payload: dict, prefer: Optional[str] = None) -> httpx.Response:
+        """POST a generate request, failing over to another node on connection errors"""
+        tried: Set[str] = set()
+        while True:
+            backend = await self.acquire(tried, prefer)
+            started = time.perf_counter()
+            try:
+                response = await self.client_factory().post(backend.url, json=payload)
+                response.raise_for_status()
+            except RETRYABLE_ERRORS as e:
+                await self.release(backend, started, e)
+                tried.add(backend.url)
+                self.retries += 1
+                continue
+            except BaseException as e:
+                await self.release(backend, started, e)
+                raise
+            await self.release(backend, started)
+            return response
+
+    @asynccontextmanager
+    async def stream(self, payload: dict, prefer: Optional[str] = None) -> AsyncIterator[httpx.Response]:
+        """Open a streaming generate request; fails over only before the response starts"""
+        tried: Set[str] = set()
+        while True:
+            backend = await self.acquire(tried, prefer)
+            started = time.perf_counter()
+            client = self.client_factory()
+            try:
+                response = await client.send(client.build_request('POST', backend.url, json=payload), stream=True)
+            except RETRYABLE_ERRORS as e:
+                await self.release(backend, started, e)
+                tried.add(backend.url)
+                self.retries += 1
+                continue
+            except BaseException as e:
+                await self.release(backend, started, e)
+                raise
+            break
+
+        error: Optional[BaseException] = None
+        try:
+            response.raise_for_status()
+            yield response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await response.aclose()
+            await self.release(backend, started, error)
+
+    def stats(self) -> dict:
+        return {
+            'retries': self.retries,
+            'backends': [backend.stats() for backend in self.backends]
+        }
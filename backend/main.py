@@ -1,18 +1,44 @@
 import os
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form
+import json
+import time
+import base64
+import asyncio
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session, select
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
+from typing import Callable, List, Literal, NamedTuple, Optional, Tuple, Union
 import uvicorn
-import requests
-from pydantic import BaseModel
-import PyPDF2
-import io
+from pydantic import BaseModel, Field
 from datetime import datetime
 from dotenv import load_dotenv
 
-from database import engine, create_db_and_tables, get_session, test_connection
-from models import User, Resume
+from database import async_engine, async_session_maker, create_db_and_tables, get_async_session, ping_database, test_connection
+from models import User, Resume, ImprovementJob, ResumeVersion
+from llm import QWEN_MODEL, QWEN_OPTIONS, LLMError, stream_generate, close_llm_client, llm_router
+from cache import response_cache, make_cache_key
+from jobs import job_queue, QueueFullError
+from singleflight import improvement_flight
+from admission import admission, Overloaded, QueueFull
+from pdf_extract import PDFExtractionError, extract_pdf_pages, shutdown_pdf_pool
+from chunking import estimate_tokens, fits_context, chunk_token_budget, chunk_resume
+from scoring import KeywordScorer
+from sections import parse_resume, resume_sections, split_sections
+from edits import IMPROVEMENT_OUTPUT_MODE, EditParseError, apply_edits, number_lines, output_mode_stats, parse_edits
+from search import index_resume, search_resumes
+from embeddings import index_embeddings, semantic_search
+from versions import commit_improvement, commit_improvements, materialize
+from kv_context import context_stats, generate_with_context, get_context, record_reuse, should_reuse
+from warmup import model_warmer
+from metrics import PROMPT_CHARS, MetricsMiddleware, render_metrics
+from export import export_user_resumes
+from uploads import (BULK_UPLOAD_MAX_BYTES, UPLOAD_FORM_OVERHEAD, UPLOAD_MAX_BYTES, UploadSizeLimitMiddleware,
+                     UploadTooLarge, get_extracted_text, hash_upload, store_extracted_text)
+from ingest import (BULK_BATCH_SIZE, BULK_EXTRACT_CONCURRENCY, IngestError, BulkItem, expand_uploads, insert_resumes,
+                    map_bounded, open_uploads)
 
 # Load environment variables
 load_dotenv()
@@ -28,8 +54,21 @@ app.add_middleware(
     allow_origins=['http://localhost:3000', 'http://localhost:5173'],
     allow_credentials=True,
     allow_methods=['*'],
-    allow_headers=['*']    
+    allow_headers=['*'],
+    expose_headers=['X-Next-Cursor']
 )
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        '/resumes/upload': UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD,
+        '/resumes/bulk': BULK_UPLOAD_MAX_BYTES
+    }
+)
+app.add_middleware(MetricsMiddleware)
+
+# Pagination configuration
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '500'))
 
 # Pydantic Models
 class UserCreate(BaseModel):
@@ -51,59 +90,223 @@ class ResumeResponse(BaseModel):
     user_id: int
     original_text: str
     improved_text: Optional[str]
+    sections: Optional[List[dict]] = None
+    contact: Optional[dict] = None
+    created_at: datetime
+
+class ResumeSummary(BaseModel):
+    id: int
+    user_id: int
+    has_improved_text: bool
     created_at: datetime
 
 class AnalysisRequest(BaseModel):
     job_description: Optional[str] = None
     improvement_focus: Optional[str] = 'general'
+    bypass_cache: bool = False
+    # Give up (503) rather than start LLM work that cannot finish within this many seconds
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    # Improve only these sections (e.g. ["skills", "projects"]) of the latest version and keep the rest as is
+    sections: Optional[List[str]] = None
+    # 'edits' asks for changed lines only and falls back to 'rewrite' if they cannot be applied
+    output_mode: Literal['rewrite', 'edits'] = IMPROVEMENT_OUTPUT_MODE
+
+class BatchImproveRequest(AnalysisRequest):
+    resume_ids: List[int] = Field(min_length=1)
 
 class ImproveResponse(BaseModel):
     resume_id: int
     improved_text: str
     message: str
+    cached: bool = False
+    version: Optional[int] = None
 
-# Qwen configuration
-QWEN_API_URL = os.getenv('QWEN_API_URL', 'http://localhost:11434/api/generate')
-QWEN_MODEL = os.getenv('QWEN_MODEL', 'qwen2.5:7b-instruct')
+class JobResponse(BaseModel):
+    id: int
+    resume_id: int
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ScoreRequest(BaseModel):
+    job_description: str
+    use_improved_text: bool = False
+
+class BatchScoreRequest(BaseModel):
+    job_description: str
+    resume_ids: Optional[List[int]] = None
+    user_id: Optional[int] = None
+    use_improved_text: bool = False
+    include_keywords: bool = False
+    top_k: Optional[int] = Field(default=None, ge=1)
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
+class ScoreResponse(BaseModel):
+    resume_id: int
+    score: float
+    similarity: float
+    coverage: float
+    matched_keywords: Optional[List[str]] = None
+    missing_keywords: Optional[List[str]] = None
+
+class SearchResult(BaseModel):
+    resume_id: int
+    user_id: int
+    rank: float
+    snippet: str
+    created_at: datetime
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    next_offset: Optional[int] = None
+
+class SemanticSearchRequest(BaseModel):
+    query: str
+    k: int = Field(default=20, ge=1, le=MAX_PAGE_SIZE)
+
+class SemanticSearchResult(BaseModel):
+    resume_id: int
+    user_id: int
+    similarity: float
+    created_at: datetime
+
+class ResumeVersionSummary(BaseModel):
+    version: int
+    parent_version: int
+    focus: Optional[str] = None
+    job_description_hash: Optional[str] = None
+    model: Optional[str] = None
+    is_snapshot: bool
+    stored_bytes: int
+    text_length: int
+    created_at: datetime
+
+class ResumeVersionResponse(ResumeVersionSummary):
+    resume_id: int
+    text: str
+
+class BatchScoreResponse(BaseModel):
+    scored: int
+    results: List[ScoreResponse]
+
+# Batch improvement configuration; admission control still bounds LLM calls across all requests
+BATCH_IMPROVE_MAX_RESUMES = int(os.getenv('BATCH_IMPROVE_MAX_RESUMES', '100'))
+BATCH_IMPROVE_CONCURRENCY = int(os.getenv('BATCH_IMPROVE_CONCURRENCY', '4'))
+
+async def embed_resumes(resume_ids: List[int], texts: List[str]):
+    """Add resumes to the semantic index; a failure never fails the upload"""
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + '\n'
-        return text.strip()
-    except Exception as e:
+        await index_embeddings(resume_ids, texts)
+    except (LLMError, ValueError, OSError) as e:
+        print(f'✗ Failed to embed resumes {resume_ids[:5]}: {e}')
+
+async def extract_text_from_pdf(file_content: bytes) -> str:
+    """Extract text from PDF file in the extraction process pool"""
+    try:
+        pages = await extract_pdf_pages(file_content)
+        return '\n'.join(pages).strip()
+    except PDFExtractionError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f'Error extracting text from PDF: {str(e)}'
         )
 
-def call_qwen_llm(prompt: str) -> str:
-    """Call Qwen LLM API"""
+class ImprovementPrompt(NamedTuple):
+    """An improvement prompt split where its per-request part starts"""
+    # Instructions, job description and resume; identical across focuses so
+    # Ollama can continue from the KV context it already evaluated for them
+    prefix: str
+    suffix: str
+    output_mode: str = 'rewrite'
+    # The resume text (whole, chunk or section) the prompt asks to improve
+    resume_text: str = ''
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+async def extract_uploaded_pdf(file: UploadFile, session: AsyncSession) -> str:
+    """Text of an uploaded PDF, extracted only the first time its exact bytes are seen"""
     try:
-        payload = {
-            'model': QWEN_MODEL,
-            'prompt': prompt,
-            'stream': False
-        }
-        response = requests.post(QWEN_API_URL, json=payload, timeout=120)
-        response.raise_for_status()
+        sha256, size = await hash_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e)
+        )
+
+    resume_text = await get_extracted_text(session, sha256)
+    if resume_text is None:
+        resume_text = await extract_text_from_pdf(await file.read())
+        await store_extracted_text(session, sha256, resume_text, size)
+    return resume_text
+
+def request_deadline(analysis: AnalysisRequest) -> Optional[float]:
+    """Monotonic deadline for an improvement, if the caller set one"""
+    if analysis.deadline_seconds is None:
+        return None
+    return time.monotonic() + analysis.deadline_seconds
+
+def overloaded_error(e: Overloaded) -> HTTPException:
+    """429 when the LLM wait queue is full, 503 when a call timed out waiting or would miss its deadline"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS if isinstance(e, QueueFull) else status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={'Retry-After': str(e.retry_after)}
+    )
 
-        result = response.json()
+async def call_qwen_llm(prompt: ImprovementPrompt, resume_id: int, deadline: Optional[float] = None,
+                        wait: bool = False, prime_context: bool = True) -> str:
+    """Call Qwen LLM API through the admission controller, continuing from the resume's stored context"""
+    try:
+        async with admission.slot(deadline, wait):
+            started = time.perf_counter()
+            result = await generate_with_context(resume_id, prompt.prefix, prompt.suffix, prime_context)
+        output_mode_stats.observe(prompt.output_mode, result.get('eval_count') or 0, time.perf_counter() - started)
         return result.get('response', '').strip()
    
-    except requests.exceptions.RequestException as e:
+    except Overloaded as e:
+        raise overloaded_error(e)
+    except LLMError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f'Error calling Qwen LLM: {str(e)}'
         )
 
-def create_improvement_prompt(resume_text: str, job_description: Optional[str] = None, focus: str = 'general') -> str:
-    """Create prompt for resume improvement"""
-    base_prompt = f'''You are an expert resume writer and career coach. Analyze and improve the following resume for ATS compatibility and professional impact.
+async def generate_improvement(prompt: ImprovementPrompt, resume_id: int, session: AsyncSession,
+                               bypass_cache: bool = False, deadline: Optional[float] = None,
+                               wait: bool = False, prime_context: bool = True) -> Tuple[str, bool]:
+    """Answer a prompt from the response cache, falling back to Qwen; wait queues for an LLM slot without limit"""
+    key = make_cache_key(prompt.text, QWEN_MODEL, QWEN_OPTIONS)
+    if not bypass_cache:
+        cached = await response_cache.get(key, session)
+        if cached is not None:
+            return cached, True
+
+    # End the lookup's transaction so no pool connection is held while waiting on
+    # the LLM; concurrent chunks would otherwise exhaust the pool
+    await session.commit()
+
+    # Identical concurrent requests wait on a single upstream generation
+    improved_text, shared = await improvement_flight.do(key, lambda: call_qwen_llm(prompt, resume_id, deadline, wait, prime_context))
+    if not shared:
+        await response_cache.put(key, improved_text, QWEN_MODEL, session)
+    return improved_text, False
+
+def create_improvement_prompt(
+    resume_text: str,
+    job_description: Optional[str] = None,
+    focus: str = 'general',
+    part: Optional[Tuple[int, int]] = None,
+    section: Optional[str] = None,
+    output_mode: str = 'rewrite'
+) -> ImprovementPrompt:
+    """Create prompt for resume improvement; part=(i, n) marks one chunk of a long resume, section one selected section"""
+    base_prompt = '''You are an expert resume writer and career coach. Analyze and improve the following resume for ATS compatibility and professional impact.
 
 Your expertise includes:
 - ATS (Applicant Tracking System) optimization
@@ -111,12 +314,10 @@ Your expertise includes:
 - Quantifying achievements effectively
 - Industry-specific terminology and best practices
 - Modern resume formatting and structure
-
-===== ORIGINAL RESUME =====
-{resume_text}
-===== END OF ORIGINAL RESUME =====
 '''
 
+    # The job description goes before the resume so every resume improved
+    # against it shares the same leading tokens
     if job_description:
         base_prompt += f'''
 ===== TARGET JOB DESCRIPTION =====
@@ -130,6 +331,19 @@ IMPORTANT: Carefully analyze the job description and identify:
 4. Technical tools or technologies required
 
 Tailor the resume to highlight experiences and skills that match these requirements.
+'''
+
+    if output_mode == 'edits':
+        base_prompt += f'''
+===== ORIGINAL RESUME (NUMBERED LINES) =====
+{number_lines(resume_text)}
+===== END OF ORIGINAL RESUME =====
+'''
+    else:
+        base_prompt += f'''
+===== ORIGINAL RESUME =====
+{resume_text}
+===== END OF ORIGINAL RESUME =====
 '''
 
     focus_instructions = {
@@ -257,9 +471,39 @@ Optimize this resume to pass ATS screening:
 '''
     }
 
-    base_prompt += focus_instructions.get(focus, focus_instructions['general'])
+    suffix = focus_instructions.get(focus, focus_instructions['general'])
+
+    if part:
+        suffix += f'''
+===== PARTIAL RESUME: PART {part[0]} OF {part[1]} =====
+The resume above is only one part of a longer resume; the other parts are being improved separately.
+Improve only the sections shown, keep their headings and order, and do not add sections, a summary or contact details that are not in this part.
+'''
+
+    if section:
+        suffix += f'''
+===== SELECTED SECTION: {section.upper()} =====
+The resume above is only the {section} section of a longer resume; the other sections are kept as they are.
+Improve only this section, keep its heading, and do not add other sections, a summary or contact details.
+'''
    
-    base_prompt += '''
+    if output_mode == 'edits':
+        suffix += '''
+
+===== INSTRUCTIONS =====
+1. Improve the resume by editing individual numbered lines; leave lines that are already good unchanged
+2. Maintain all factual information (do not invent experience or skills)
+3. Improve language, presentation, and impact
+4. Make it more professional and compelling
+5. Ensure it's ATS-friendly
+
+OUTPUT FORMAT: Return ONLY a JSON array of edits, no additional commentary or explanations, for example:
+[{"line": 4, "text": "Led a team of 5 engineers to deliver the payments API"}, {"line": 9, "text": ""}]
+"line" is the number of an original line and "text" replaces that whole line: use \\n to split it into several lines and "" to delete it.
+Do not include unchanged lines.
+'''
+    else:
+        suffix += '''
 
 ===== INSTRUCTIONS =====
 1. Provide an improved version of the resume
@@ -271,14 +515,166 @@ Optimize this resume to pass ATS screening:
 OUTPUT FORMAT: Return ONLY the improved resume text, no additional commentary or explanations.
 '''
    
-    return base_prompt
+    return ImprovementPrompt(base_prompt, suffix, output_mode, resume_text)
+
+def build_improvement_prompts(resume_text: str, job_description: Optional[str] = None, focus: str = 'general',
+                              output_mode: str = 'rewrite', section: Optional[str] = None) -> List[ImprovementPrompt]:
+    """One prompt if the resume (or selected section) fits the model context, otherwise one per chunk"""
+    prompt = create_improvement_prompt(resume_text, job_description, focus, section=section, output_mode=output_mode)
+    if fits_context(prompt.text, resume_text):
+        prompts = [prompt]
+    else:
+        overhead = estimate_tokens(
+            create_improvement_prompt('', job_description, focus, part=(1, 1), section=section,
+                                      output_mode=output_mode).text
+        )
+        chunks = chunk_resume(resume_text, chunk_token_budget(overhead))
+        prompts = [
+            create_improvement_prompt(chunk, job_description, focus, part=(index + 1, len(chunks)),
+                                      section=section, output_mode=output_mode)
+            for index, chunk in enumerate(chunks)
+        ]
+    for prompt in prompts:
+        PROMPT_CHARS.observe(len(prompt.text))
+    return prompts
+
+class ImprovementPlan(NamedTuple):
+    """The prompts of one improvement and how their outputs make up the improved resume"""
+    prompts: List[ImprovementPrompt]
+    merge: Callable[[List[str]], str]
+
+def plan_improvement(resume: Resume, analysis: AnalysisRequest) -> ImprovementPlan:
+    """Prompts for the whole resume, or only for the sections the request selected"""
+    focus = analysis.improvement_focus or 'general'
+    if not analysis.sections:
+        prompts = build_improvement_prompts(resume.original_text, analysis.job_description, focus, analysis.output_mode)
+        return ImprovementPlan(prompts, lambda texts: '\n\n'.join(texts))
+
+    # Sections are merged into the latest version, so improving ["skills"] and then
+    # ["projects"] keeps both rewrites; stored offsets only slice original_text
+    if resume.improved_text:
+        sections = split_sections(resume.improved_text)
+    else:
+        sections = resume_sections(resume.original_text, resume.sections)
+    wanted = {name.lower() for name in analysis.sections}
+    selected = [index for index, section in enumerate(sections) if section.name in wanted]
+    if not selected:
+        available = ', '.join(section.name for section in sections)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Latest version of the resume has none of the selected sections; it has: {available}'
+        )
+
+    # A section too long for the model context is chunked like a long resume
+    prompts: List[ImprovementPrompt] = []
+    part_counts: List[int] = []
+    for index in selected:
+        section_prompts = build_improvement_prompts(
+            sections[index].text.strip(), analysis.job_description, focus, analysis.output_mode,
+            section=sections[index].heading or sections[index].name
+        )
+        prompts.extend(section_prompts)
+        part_counts.append(len(section_prompts))
+
+    def merge(texts: List[str]) -> str:
+        # Rewritten sections replace the current ones in place; the rest is kept verbatim
+        improved = {}
+        start = 0
+        for index, count in zip(selected, part_counts):
+            improved[index] = '\n\n'.join(text.strip() for text in texts[start:start + count])
+            start += count
+        return ''.join(
+            improved[index] + '\n\n' if index in improved else section.text
+            for index, section in enumerate(sections)
+        ).strip()
+
+    return ImprovementPlan(prompts, merge)
+
+async def improve_resume_text(resume: Resume, analysis: AnalysisRequest, session: AsyncSession,
+                              deadline: Optional[float] = None, wait: bool = False,
+                              prime_context: bool = True) -> Tuple[str, bool]:
+    """Generate the improved text of a resume without persisting it; prime_context=False never primes a KV context"""
+    plan = plan_improvement(resume, analysis)
+    # End the caller's transaction (the resume load) so its pooled connection is not
+    # held through the LLM calls; parts of a long resume use sessions of their own
+    await session.commit()
+
+    # Call LLM (or answer from the cache); chunks of a long resume and selected
+    # sections run concurrently and are reassembled in order
+    async def generate_part(prompt: ImprovementPrompt) -> Tuple[str, bool]:
+        if len(plan.prompts) == 1:
+            return await generate_improvement(prompt, resume.id, session, analysis.bypass_cache, deadline, wait,
+                                              prime_context)
+        # Concurrent tasks must not share one AsyncSession
+        async with async_session_maker() as part_session:
+            return await generate_improvement(prompt, resume.id, part_session, analysis.bypass_cache, deadline, wait,
+                                              prime_context)
+
+    results = await asyncio.gather(*[generate_part(prompt) for prompt in plan.prompts])
+    texts = [text for text, _ in results]
+    if analysis.output_mode == 'edits':
+        try:
+            texts = [
+                apply_edits(prompt.resume_text, parse_edits(text, prompt.resume_text))
+                for prompt, text in zip(plan.prompts, texts)
+            ]
+        except EditParseError as e:
+            print(f'✗ Edit list for resume {resume.id} could not be applied, rewriting instead: {e}')
+            output_mode_stats.fallback()
+            rewrite = analysis.model_copy(update={'output_mode': 'rewrite'})
+            return await improve_resume_text(resume, rewrite, session, deadline, wait, prime_context)
+    return plan.merge(texts), all(chunk_cached for _, chunk_cached in results)
+
+async def apply_improvement(resume: Resume, analysis: AnalysisRequest, session: AsyncSession,
+                            wait: bool = False) -> Tuple[str, bool, int]:
+    """Improve a stored resume, persist the result on the row and record it as a new version"""
+    improved_text, cached = await improve_resume_text(resume, analysis, session, request_deadline(analysis), wait)
+
+    # Update resume with improved text and keep the previous ones as versions
+    version = await commit_improvement(
+        session, resume, improved_text,
+        analysis.improvement_focus or 'general', analysis.job_description, QWEN_MODEL
+    )
+    index_resume(resume.id, resume.user_id, resume.original_text, resume.improved_text)
+    return improved_text, cached, version.version
+
+async def run_improvement_job(job: ImprovementJob, session: AsyncSession) -> str:
+    """Job queue handler for queued improvements"""
+    resume = await session.get(Resume, job.resume_id)
+    if not resume:
+        raise ValueError('Resume not found')
+    # Queued jobs wait for an LLM slot instead of failing when interactive traffic fills the queue
+    improved_text, _, _ = await apply_improvement(resume, AnalysisRequest(**job.analysis), session, wait=True)
+    return improved_text
 
 @app.on_event('startup')
-def on_startup():
+async def on_startup():
     """Initialize application on startup"""
     print('Starting Resume Analyzer API...')
     create_db_and_tables()
     test_connection()
+    await job_queue.start(run_improvement_job)
+    await llm_router.start()
+    await model_warmer.start()
+
+@app.on_event('shutdown')
+async def on_shutdown():
+    """Stop workers and release pooled LLM connections on shutdown"""
+    await model_warmer.stop()
+    await llm_router.stop()
+    await job_queue.stop()
+    await close_llm_client()
+    shutdown_pdf_pool()
+    await async_engine.dispose()
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Every pooled database connection is busy; ask the client to back off"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': 'Database is busy, please retry'},
+        headers={'Retry-After': '1'}
+    )
 
 @app.get('/')
 def read_root():
@@ -286,24 +682,58 @@ def read_root():
     return {
         'message': 'Resume Analyzer API is running',
         'version': '1.0.0',
-        'status': 'healthy',
+        'status': 'healthy',  # liveness only; see /ready
         'endpoints': {
+            'GET /ready': 'Readiness of the database and the LLM model',
             'POST /users/': 'Create a new user',
-            'GET /users/': 'Get all users',
+            'GET /users/': 'Get users (paginated)',
             'GET /users/{user_id}': 'Get user by ID',
             'POST /resumes/upload': 'Upload resume (PDF or text)',
+            'POST /resumes/bulk': 'Upload many resumes (PDFs, ZIP or NDJSON)',
             'POST /resumes/{resume_id}/improve': 'Improve resume with AI',
+            'POST /resumes/{resume_id}/improve/stream': 'Improve resume with AI, streaming tokens as SSE or NDJSON',
+            'POST /resumes/{resume_id}/improve/jobs': 'Queue a resume improvement job',
+            'POST /resumes/improve/batch': 'Improve many resumes against one job description, streaming results',
+            'GET /jobs/{job_id}': 'Get improvement job status and result',
+            'POST /resumes/{resume_id}/score': 'Score a resume against a job description (no LLM)',
+            'POST /resumes/score/batch': 'Score many resumes against one job description',
+            'GET /search': 'Full-text search over resumes',
+            'POST /search/semantic': 'Top-k resumes by embedding similarity',
             'GET /resumes/{resume_id}': 'Get resume by ID',
-            'GET /users/{user_id}/resumes': 'Get all resumes for a user'
+            'GET /resumes/{resume_id}/versions': 'List improvement versions of a resume',
+            'GET /resumes/{resume_id}/versions/{version}': 'Get the text of one improvement version',
+            'GET /users/{user_id}/resumes': 'Get resumes for a user (paginated, summaries unless include_text)',
+            'GET /users/{user_id}/resumes/export': 'Export all of a user\'s resumes as NDJSON (optionally gzip)',
+            'GET /llm/stats': 'LLM cache, request coalescing, job queue, backend, admission, KV context and output mode statistics',
+            'GET /metrics': 'Prometheus metrics'
         }
     }
 
+@app.get('/ready')
+async def readiness(response: Response):
+    """Readiness probe: 200 only when both the database and the model can serve requests"""
+    try:
+        await ping_database()
+        database = {'ready': True, 'error': None}
+    except Exception as e:
+        database = {'ready': False, 'error': str(e) or e.__class__.__name__}
+    model = model_warmer.status()
+
+    ready = database['ready'] and model['ready']
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        'status': 'ready' if ready else 'not_ready',
+        'database': database,
+        'model': model
+    }
+
 # User Endpoints
 @app.post('/users/', response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, session: Session = Depends(get_session)):
+async def create_user(user: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Create a new user"""
     statement = select(User).where(User.email == user.email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
 
     if existing_user:
         raise HTTPException(
@@ -313,20 +743,39 @@ def create_user(user: UserCreate, session: Session = Depends(get_session)):
    
     db_user = User(username=user.username, email=user.email)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent signup; the unique index caught it
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='User with this email already exists'
+        )
+    await session.refresh(db_user)
     return db_user
 
 @app.get('/users/', response_model=List[UserResponse])
-def get_users(session: Session = Depends(get_session)):
-    """Get all users"""
-    users = session.exec(select(User)).all()
+async def get_users(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Get users a page at a time; follow X-Next-Cursor for the next page"""
+    statement = select(User).order_by(User.id).limit(limit)
+    if cursor is not None:
+        statement = statement.where(User.id > cursor)
+    users = (await session.exec(statement)).all()
+
+    if len(users) == limit:
+        response.headers['X-Next-Cursor'] = str(users[-1].id)
     return users
 
 @app.get('/users/{user_id}', response_model=UserResponse)
-def get_user(user_id: int, session: Session = Depends(get_session)):
+async def get_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
     """Get user by ID"""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -340,11 +789,11 @@ async def upload_resume(
     user_id: int = Form(...),
     file: Optional[UploadFile] = File(None),
     text: Optional[str] = Form(None),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Upload a resume as PDF file or plain text"""
     # Check if user exists
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -359,8 +808,7 @@ async def upload_resume(
                 detail='Only PDF files are supported'
             )
        
-        content = await file.read()
-        resume_text = extract_text_from_pdf(content)
+        resume_text = await extract_uploaded_pdf(file, session)
     elif text:
         resume_text = text
     else:
@@ -369,58 +817,525 @@ async def upload_resume(
             detail='Either file or text must be provided'
         )
    
-    # Create resume record
+    # Create resume record with its sections parsed once, here
+    sections, contact = parse_resume(resume_text)
     db_resume = Resume(
         user_id=user_id,
-        original_text=resume_text
+        original_text=resume_text,
+        sections=sections,
+        contact=contact
     )
     session.add(db_resume)
-    session.commit()
-    session.refresh(db_resume)
+    await session.commit()
+    await session.refresh(db_resume)
+    index_resume(db_resume.id, user_id, resume_text)
+    await embed_resumes([db_resume.id], [resume_text])
    
     return db_resume
 
+@app.post('/resumes/bulk')
+async def bulk_upload_resumes(
+    user_id: int = Form(...),
+    files: List[UploadFile] = File(...),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Upload many resumes as PDFs, ZIP archives or NDJSON text, streaming per-file results"""
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='User not found'
+        )
+    # Release the pooled connection before extraction; inserts use a session of their own
+    await session.commit()
+
+    try:
+        uploads = await open_uploads(files)
+    except IngestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    async def extract(item: BulkItem) -> Tuple[BulkItem, Optional[str], Optional[str]]:
+        try:
+            content = await item.load()
+            if item.kind == 'pdf':
+                content = '\n'.join(await extract_pdf_pages(content)).strip()
+            if not content.strip():
+                return item, None, 'No text could be extracted'
+            return item, content, None
+        except (IngestError, PDFExtractionError) as e:
+            return item, None, str(e)
+
+    async def result_stream():
+        created = failed = 0
+        batch: List[Tuple[str, str]] = []
+        # Embeddings are computed in larger batches once the rows are committed
+        embed_ids: List[int] = []
+        embed_texts: List[str] = []
+
+        async def flush_embeddings():
+            await embed_resumes(embed_ids, embed_texts)
+            embed_ids.clear()
+            embed_texts.clear()
+
+        async with async_session_maker() as bulk_session:
+            async def flush():
+                ids = await insert_resumes(bulk_session, user_id, [text for _, text in batch])
+                for (_, text), resume_id in zip(batch, ids):
+                    index_resume(resume_id, user_id, text)
+                    embed_ids.append(resume_id)
+                    embed_texts.append(text)
+                lines = [
+                    json.dumps({'name': name, 'status': 'created', 'resume_id': resume_id}) + '\n'
+                    for (name, _), resume_id in zip(batch, ids)
+                ]
+                batch.clear()
+                return lines
+
+            # Items are read and extracted as slots free up, so memory stays bounded
+            # by the concurrency rather than growing with the whole upload
+            results = map_bounded(expand_uploads(uploads), extract, BULK_EXTRACT_CONCURRENCY)
+            try:
+                async for item, resume_text, error in results:
+                    if error:
+                        failed += 1
+                        yield json.dumps({'name': item.name, 'status': 'error', 'detail': error}) + '\n'
+                        continue
+
+                    batch.append((item.name, resume_text))
+                    if len(batch) >= BULK_BATCH_SIZE:
+                        lines = await flush()
+                        created += len(lines)
+                        yield ''.join(lines)
+                        await flush_embeddings()
+            except IngestError as e:
+                # Limits that can only be checked while reading, such as BULK_MAX_FILES for NDJSON
+                yield json.dumps({'status': 'error', 'detail': str(e)}) + '\n'
+
+            if batch:
+                lines = await flush()
+                created += len(lines)
+                yield ''.join(lines)
+
+        await flush_embeddings()
+
+        yield json.dumps({'status': 'complete', 'created': created, 'failed': failed}) + '\n'
+
+    return StreamingResponse(result_stream(), media_type='application/x-ndjson')
+
 @app.post('/resumes/{resume_id}/improve', response_model=ImproveResponse)
-def improve_resume(
+async def improve_resume(
     resume_id: int,
     analysis: AnalysisRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Improve resume using Qwen LLM"""
     # Get resume
-    resume = session.get(Resume, resume_id)
+    resume = await session.get(Resume, resume_id)
     if not resume:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Resume not found'
         )
    
-    # Create improvement prompt
-    prompt = create_improvement_prompt(
-        resume.original_text,
-        analysis.job_description,
-        analysis.improvement_focus or 'general'
-    )
-   
-    # Call LLM
-    improved_text = call_qwen_llm(prompt)
-   
-    # Update resume with improved text
-    resume.improved_text = improved_text
-    session.add(resume)
-    session.commit()
-    session.refresh(resume)
+    improved_text, cached, version = await apply_improvement(resume, analysis, session)
    
     return {
         'resume_id': resume.id,
         'improved_text': improved_text,
-        'message': 'Resume improved successfully'
+        'message': 'Resume improved successfully',
+        'cached': cached,
+        'version': version
     }
 
+@app.post('/resumes/{resume_id}/improve/jobs', response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_improvement(
+    resume_id: int,
+    analysis: AnalysisRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Queue a resume improvement and return the job immediately"""
+    resume = await session.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Resume not found'
+        )
+
+    try:
+        job_queue.check_capacity()
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={'Retry-After': '30'}
+        )
+
+    job = ImprovementJob(resume_id=resume_id, analysis=analysis.model_dump())
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    job_queue.enqueue(job.id)
+    return job
+
+@app.get('/jobs/{job_id}', response_model=JobResponse)
+async def get_job(job_id: int, session: AsyncSession = Depends(get_async_session)):
+    """Get improvement job status and result"""
+    job = await session.get(ImprovementJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Job not found'
+        )
+    return job
+
+STREAM_FORMATS = {
+    'sse': 'text/event-stream',
+    'ndjson': 'application/x-ndjson'
+}
+
+def encode_stream_event(event: str, data: dict, stream_format: str) -> str:
+    """Encode one streaming event as an SSE frame or an NDJSON line"""
+    if stream_format == 'sse':
+        return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    return json.dumps({'event': event, **data}) + '\n'
+
+@app.post('/resumes/{resume_id}/improve/stream')
+async def improve_resume_stream(
+    resume_id: int,
+    analysis: AnalysisRequest,
+    request: Request,
+    format: str = 'sse',
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Improve resume using Qwen LLM, streaming tokens as they are generated"""
+    if format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Unsupported stream format, expected one of: {", ".join(STREAM_FORMATS)}'
+        )
+
+    if analysis.output_mode == 'edits':
+        if 'output_mode' in analysis.model_fields_set:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Edit-list output cannot be streamed; use POST /resumes/{resume_id}/improve'
+            )
+        # Edits are only the server default, which clients that stream did not ask for
+        analysis = analysis.model_copy(update={'output_mode': 'rewrite'})
+
+    resume = await session.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Resume not found'
+        )
+    # Release the pooled connection before streaming; the generator uses sessions of its own
+    await session.commit()
+
+    # Long resumes are streamed chunk by chunk and selected sections one by one, in order
+    plan = plan_improvement(resume, analysis)
+    prompts = plan.prompts
+    cache_keys = [make_cache_key(prompt.text, QWEN_MODEL, QWEN_OPTIONS) for prompt in prompts]
+    deadline = request_deadline(analysis)
+
+    async def event_stream():
+        # Tokens are forwarded as soon as they arrive; only the assembled
+        # text is kept so it can be persisted once the generation completes
+        improved_chunks = []
+        generated = {}
+        for index, (prompt, cache_key) in enumerate(zip(prompts, cache_keys)):
+            if index:
+                yield encode_stream_event('token', {'token': '\n\n'}, format)
+
+            cached = None
+            if not analysis.bypass_cache:
+                async with async_session_maker() as cache_session:
+                    cached = await response_cache.get(cache_key, cache_session)
+            if cached is not None:
+                improved_chunks.append(cached)
+                yield encode_stream_event('token', {'token': cached}, format)
+                continue
+
+            parts = []
+            try:
+                async with admission.slot(deadline):
+                    context = await get_context(resume_id, prompt.prefix) if should_reuse(prompt.prefix) else None
+                    if context:
+                        chunks = stream_generate(prompt.suffix, context=context.context, prefer=context.backend)
+                    else:
+                        chunks = stream_generate(prompt.text)
+                    async for chunk in chunks:
+                        if await request.is_disconnected():
+                            return
+                        token = chunk.get('response', '')
+                        if token:
+                            parts.append(token)
+                            yield encode_stream_event('token', {'token': token}, format)
+                        if chunk.get('done'):
+                            if context:
+                                record_reuse(context, chunk, prompt.suffix)
+                            break
+            except Overloaded as e:
+                error = overloaded_error(e)
+                yield encode_stream_event('error', {'detail': error.detail, 'status': error.status_code,
+                                                    'retry_after': e.retry_after}, format)
+                return
+            except LLMError as e:
+                yield encode_stream_event('error', {'detail': f'Error calling Qwen LLM: {str(e)}'}, format)
+                return
+            generated[cache_key] = ''.join(parts).strip()
+            improved_chunks.append(generated[cache_key])
+
+        improved_text = plan.merge(improved_chunks)
+        # The request-scoped session is not guaranteed to outlive the response
+        version = None
+        async with async_session_maker() as stream_session:
+            db_resume = await stream_session.get(Resume, resume_id)
+            if db_resume:
+                version = (await commit_improvement(
+                    stream_session, db_resume, improved_text,
+                    analysis.improvement_focus or 'general', analysis.job_description, QWEN_MODEL
+                )).version
+                index_resume(db_resume.id, db_resume.user_id, db_resume.original_text, improved_text)
+            for cache_key, chunk_text in generated.items():
+                await response_cache.put(cache_key, chunk_text, QWEN_MODEL, stream_session)
+
+        yield encode_stream_event('done', {
+            'resume_id': resume_id,
+            'message': 'Resume improved successfully',
+            'cached': not generated,
+            'version': version
+        }, format)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type=STREAM_FORMATS[format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+async def improve_batch_item(resume: Resume, analysis: AnalysisRequest, deadline: Optional[float],
+                             slots: asyncio.Semaphore) -> Tuple[Resume, Optional[Tuple[str, bool]], Optional[HTTPException]]:
+    """One resume of a batch; errors are returned so the rest of the batch carries on"""
+    async with slots:
+        # Each item gets its own session so concurrent items never share one
+        async with async_session_maker() as item_session:
+            try:
+                # Batch items are one-off improvements, where priming a context only adds a call
+                return resume, await improve_resume_text(resume, analysis, item_session, deadline,
+                                                         prime_context=False), None
+            except HTTPException as e:
+                return resume, None, e
+            except Exception as e:
+                # Anything else fails this resume only, not the rest of the batch
+                print(f'✗ Batch improvement of resume {resume.id} failed: {e}')
+                return resume, None, HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f'Error improving resume: {e}'
+                )
+
+async def persist_batch_improvements(improved: dict, analysis: AnalysisRequest) -> dict:
+    """All improved_text updates of a batch and their versions in one commit"""
+    async with async_session_maker() as commit_session:
+        statement = select(Resume).where(Resume.id.in_(list(improved)))
+        rows = (await commit_session.exec(statement)).all()
+        versions = await commit_improvements(
+            commit_session, [(row, improved[row.id]) for row in rows],
+            analysis.improvement_focus or 'general', analysis.job_description, QWEN_MODEL
+        )
+        for row in rows:
+            index_resume(row.id, row.user_id, row.original_text, row.improved_text)
+    return versions
+
+@app.post('/resumes/improve/batch')
+async def improve_resumes_batch(
+    batch: BatchImproveRequest,
+    request: Request,
+    format: str = 'ndjson',
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Improve many resumes against one job description, streaming each result as it finishes"""
+    if format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Unsupported stream format, expected one of: {", ".join(STREAM_FORMATS)}'
+        )
+    resume_ids = list(dict.fromkeys(batch.resume_ids))
+    if len(resume_ids) > BATCH_IMPROVE_MAX_RESUMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'At most {BATCH_IMPROVE_MAX_RESUMES} resumes per batch'
+        )
+
+    # Every resume of the batch in one query
+    resumes = {
+        resume.id: resume
+        for resume in (await session.exec(select(Resume).where(Resume.id.in_(resume_ids)))).all()
+    }
+    # Release the pooled connection before streaming; each item uses a session of its own
+    await session.commit()
+    analysis = AnalysisRequest(**batch.model_dump(exclude={'resume_ids'}))
+    deadline = request_deadline(analysis)
+
+    async def event_stream():
+        failed = 0
+        for resume_id in resume_ids:
+            if resume_id not in resumes:
+                failed += 1
+                yield encode_stream_event('error', {'resume_id': resume_id, 'detail': 'Resume not found',
+                                                    'status': status.HTTP_404_NOT_FOUND}, format)
+
+        # Resumes share the job description part of the prompt, so running them
+        # close together lets the LLM backends reuse its evaluated tokens
+        slots = asyncio.Semaphore(BATCH_IMPROVE_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(improve_batch_item(resumes[resume_id], analysis, deadline, slots))
+            for resume_id in resume_ids if resume_id in resumes
+        ]
+        improved = {}
+        versions = {}
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                resume, result, error = await next_result
+                if error is not None:
+                    failed += 1
+                    event = {'resume_id': resume.id, 'detail': error.detail, 'status': error.status_code}
+                    if error.headers and 'Retry-After' in error.headers:
+                        event['retry_after'] = int(error.headers['Retry-After'])
+                    yield encode_stream_event('error', event, format)
+                else:
+                    improved[resume.id] = result[0]
+                    yield encode_stream_event('result', {'resume_id': resume.id, 'improved_text': result[0],
+                                                         'cached': result[1]}, format)
+                if await request.is_disconnected():
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Improvements that finished are kept even if the client went away or the
+            # stream was cancelled; the shielded task commits them regardless
+            if improved:
+                versions = await asyncio.shield(asyncio.create_task(persist_batch_improvements(improved, analysis)))
+
+        yield encode_stream_event('done', {
+            'message': 'Batch improvement finished',
+            'improved': len(improved),
+            'failed': failed,
+            'versions': versions
+        }, format)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type=STREAM_FORMATS[format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def resume_scoring_text(resume_text: str, improved_text: Optional[str], use_improved_text: bool) -> str:
+    return (improved_text or resume_text) if use_improved_text else resume_text
+
+@app.post('/resumes/{resume_id}/score', response_model=ScoreResponse)
+async def score_resume(resume_id: int, request: ScoreRequest, session: AsyncSession = Depends(get_async_session)):
+    """Score how well a resume matches a job description without calling the LLM"""
+    resume = await session.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Resume not found'
+        )
+
+    text = resume_scoring_text(resume.original_text, resume.improved_text, request.use_improved_text)
+    result = KeywordScorer(request.job_description).score([text])[0]
+    return {'resume_id': resume.id, **result}
+
+@app.post('/resumes/score/batch', response_model=BatchScoreResponse)
+async def score_resumes(request: BatchScoreRequest, session: AsyncSession = Depends(get_async_session)):
+    """Score many stored resumes against one job description, best matches first"""
+    if request.resume_ids is None and request.user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Either resume_ids or user_id must be provided'
+        )
+
+    # Only the columns needed for scoring
+    columns = [Resume.id, Resume.original_text]
+    if request.use_improved_text:
+        columns.append(Resume.improved_text)
+    statement = select(*columns)
+    if request.resume_ids is not None:
+        statement = statement.where(Resume.id.in_(request.resume_ids))
+    if request.user_id is not None:
+        statement = statement.where(Resume.user_id == request.user_id)
+    rows = (await session.exec(statement)).all()
+
+    texts = [
+        resume_scoring_text(row.original_text, row.improved_text if request.use_improved_text else None,
+                            request.use_improved_text)
+        for row in rows
+    ]
+    # Scoring is CPU-bound; keep it off the event loop
+    scores = await asyncio.to_thread(
+        KeywordScorer(request.job_description).score, texts, keywords=request.include_keywords
+    )
+    results = sorted(
+        ({'resume_id': row.id, **result} for row, result in zip(rows, scores)),
+        key=lambda result: result['score'],
+        reverse=True
+    )
+    if request.top_k is not None:
+        results = results[:request.top_k]
+    return {'scored': len(rows), 'results': results}
+
+@app.get('/search', response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    user_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Full-text search over resume text, best matches first"""
+    results = await search_resumes(session, q, limit, offset, user_id)
+    return {
+        'query': q,
+        'results': results,
+        'next_offset': offset + limit if len(results) == limit else None
+    }
+
+@app.post('/search/semantic', response_model=List[SemanticSearchResult])
+async def search_semantic(request: SemanticSearchRequest, session: AsyncSession = Depends(get_async_session)):
+    """Top-k resumes by embedding similarity to a query such as a job description"""
+    try:
+        matches = await semantic_search(request.query, request.k)
+    except LLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not matches:
+        return []
+
+    statement = select(Resume.id, Resume.user_id, Resume.created_at).where(
+        Resume.id.in_([resume_id for resume_id, _ in matches])
+    )
+    rows = {row.id: row for row in (await session.exec(statement)).all()}
+    return [
+        {'resume_id': resume_id, 'user_id': rows[resume_id].user_id,
+         'similarity': round(similarity, 4), 'created_at': rows[resume_id].created_at}
+        for resume_id, similarity in matches
+        if resume_id in rows
+    ]
+
 @app.get('/resumes/{resume_id}', response_model=ResumeResponse)
-def get_resume(resume_id: int, session: Session = Depends(get_session)):
+async def get_resume(resume_id: int, session: AsyncSession = Depends(get_async_session)):
     """Get resume by ID"""
-    resume = session.get(Resume, resume_id)
+    resume = await session.get(Resume, resume_id)
     if not resume:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -428,19 +1343,166 @@ def get_resume(resume_id: int, session: Session = Depends(get_session)):
         )
     return resume
 
-@app.get('/users/{user_id}/resumes', response_model=List[ResumeResponse])
-def get_user_resumes(user_id: int, session: Session = Depends(get_session)):
-    """Get all resumes for a user"""
-    user = session.get(User, user_id)
+@app.get('/resumes/{resume_id}/versions', response_model=List[ResumeVersionSummary])
+async def get_resume_versions(
+    resume_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """List a resume's improvement history, newest first, without the text"""
+    resume = await session.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Resume not found'
+        )
+
+    statement = (
+        select(
+            ResumeVersion.version,
+            ResumeVersion.parent_version,
+            ResumeVersion.focus,
+            ResumeVersion.job_description_hash,
+            ResumeVersion.model,
+            ResumeVersion.is_snapshot,
+            func.length(ResumeVersion.data).label('stored_bytes'),
+            ResumeVersion.text_length,
+            ResumeVersion.created_at
+        )
+        .where(ResumeVersion.resume_id == resume_id)
+        .order_by(ResumeVersion.version.desc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        statement = statement.where(ResumeVersion.version < cursor)
+    versions = [ResumeVersionSummary(**row._mapping) for row in (await session.exec(statement)).all()]
+
+    if len(versions) == limit:
+        response.headers['X-Next-Cursor'] = str(versions[-1].version)
+    return versions
+
+@app.get('/resumes/{resume_id}/versions/{version}', response_model=ResumeVersionResponse)
+async def get_resume_version(resume_id: int, version: int, session: AsyncSession = Depends(get_async_session)):
+    """Get one version of a resume's improved text"""
+    resume = await session.get(Resume, resume_id)
+    statement = select(ResumeVersion).where(
+        ResumeVersion.resume_id == resume_id,
+        ResumeVersion.version == version
+    )
+    row = (await session.exec(statement)).first() if resume else None
+    text = await materialize(session, resume, version) if row else None
+    if text is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Resume version not found'
+        )
+    return {
+        **row.model_dump(exclude={'data', 'id'}),
+        'stored_bytes': len(row.data),
+        'text': text
+    }
+
+def encode_resume_cursor(created_at: datetime, resume_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) resume ordering"""
+    raw = f'{created_at.isoformat()}|{resume_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_resume_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, resume_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(resume_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
+
+@app.get('/users/{user_id}/resumes', response_model=Union[List[ResumeSummary], List[ResumeResponse]])
+async def get_user_resumes(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_text: bool = False,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Get a user's resumes a page at a time; text columns only with include_text"""
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='User not found'
         )
    
-    statement = select(Resume).where(Resume.user_id == user_id)
-    resumes = session.exec(statement).all()
+    if include_text:
+        statement = select(Resume)
+    else:
+        statement = select(
+            Resume.id,
+            Resume.user_id,
+            Resume.improved_text.is_not(None).label('has_improved_text'),
+            Resume.created_at
+        )
+    # Served by the (user_id, created_at) index
+    statement = (
+        statement
+        .where(Resume.user_id == user_id)
+        .order_by(Resume.created_at, Resume.id)
+        .limit(limit)
+    )
+    if cursor:
+        statement = statement.where(tuple_(Resume.created_at, Resume.id) > decode_resume_cursor(cursor))
+
+    if include_text:
+        resumes = (await session.exec(statement)).all()
+    else:
+        resumes = [ResumeSummary(**row._mapping) for row in (await session.exec(statement)).all()]
+
+    if len(resumes) == limit:
+        response.headers['X-Next-Cursor'] = encode_resume_cursor(resumes[-1].created_at, resumes[-1].id)
     return resumes
 
+@app.get('/users/{user_id}/resumes/export')
+async def export_resumes(user_id: int, gzip: bool = False, session: AsyncSession = Depends(get_async_session)):
+    """Stream all of a user's resumes as NDJSON, optionally gzip-compressed"""
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='User not found'
+        )
+
+    # A .gz file download rather than Content-Encoding, which clients would
+    # decode transparently and then save as plain NDJSON under a .gz name
+    return StreamingResponse(
+        export_user_resumes(user_id, compress=gzip),
+        media_type='application/gzip' if gzip else 'application/x-ndjson',
+        headers={
+            'Content-Disposition': f'attachment; filename="user-{user_id}-resumes.ndjson{".gz" if gzip else ""}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.get('/llm/stats')
+def get_llm_stats():
+    """LLM cache, request coalescing, job queue, backend, admission, KV context and output mode statistics"""
+    return {
+        'cache': response_cache.stats(),
+        'singleflight': improvement_flight.stats(),
+        'jobs': job_queue.stats(),
+        'router': llm_router.stats(),
+        'admission': admission.stats(),
+        'context': context_stats.stats(),
+        'output_modes': output_mode_stats.stats()
+    }
+
+@app.get('/metrics', include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == '__main__':
     uvicorn.run('main:app', host='0.0.0.0', port=8000, reload=True)
\ No newline at end of file
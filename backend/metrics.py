@@ -0,0 +1,149 @@
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.routing import Match
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time until the response body is fully sent',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being served', ['method', 'route']
+)
+
+# Database
+DB_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds', 'Time spent waiting for a pooled database connection',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_CONNECTIONS_IN_USE = Gauge('db_pool_connections_in_use', 'Pooled database connections checked out')
+
+# PDF extraction
+PDF_EXTRACT_SECONDS = Histogram(
+    'pdf_extract_duration_seconds', 'Time to extract text from one PDF',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+)
+PDF_PAGES = Histogram('pdf_pages', 'Pages per extracted PDF', buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+PDF_EXTRACT_FAILURES = Counter('pdf_extract_failures_total', 'PDFs that could not be extracted')
+PDF_EXTRACT_DEDUPLICATED = Counter(
+    'pdf_extract_deduplicated_total', 'Uploaded PDFs whose text was already extracted from identical bytes'
+)
+
+# Prompts and LLM calls
+PROMPT_CHARS = Histogram(
+    'improvement_prompt_chars', 'Characters in each improvement prompt',
+    buckets=(1000, 2500, 5000, 10000, 20000, 40000, 80000)
+)
+LLM_MODEL_READY = Gauge('llm_model_ready', 'Whether the last model warm-up or keep-warm ping succeeded')
+LLM_REQUEST_SECONDS = Histogram(
+    'llm_request_duration_seconds', 'Wall time of LLM generations', ['mode', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+)
+LLM_BACKEND_OUTSTANDING = Gauge('llm_backend_outstanding_requests', 'Requests in flight per LLM backend', ['backend'])
+LLM_BACKEND_HEALTHY = Gauge('llm_backend_healthy', 'Whether an LLM backend is in rotation', ['backend'])
+LLM_BACKEND_REQUESTS = Counter('llm_backend_requests_total', 'Requests per LLM backend', ['backend', 'outcome'])
+LLM_BACKEND_REQUEST_SECONDS = Histogram(
+    'llm_backend_request_duration_seconds', 'Request time per LLM backend', ['backend'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+)
+ADMISSION_LIMIT = Gauge('llm_admission_limit', 'Current concurrency limit for LLM calls')
+ADMISSION_IN_FLIGHT = Gauge('llm_admission_in_flight', 'LLM calls holding an admission slot')
+ADMISSION_QUEUE_DEPTH = Gauge('llm_admission_queue_depth', 'LLM calls waiting for an admission slot')
+ADMISSION_REJECTIONS = Counter('llm_admission_rejections_total', 'LLM calls rejected or shed', ['reason'])
+# Ollama's own accounting; tokens/s = rate(eval_tokens) / rate(eval_seconds)
+LLM_EVAL_TOKENS = Counter('llm_eval_tokens_total', 'Tokens generated (Ollama eval_count)')
+LLM_EVAL_SECONDS = Counter('llm_eval_seconds_total', 'Time spent generating tokens (Ollama eval_duration)')
+LLM_PROMPT_EVAL_TOKENS = Counter('llm_prompt_eval_tokens_total', 'Prompt tokens evaluated (Ollama prompt_eval_count)')
+LLM_PROMPT_EVAL_SECONDS = Counter(
+    'llm_prompt_eval_seconds_total', 'Time spent evaluating prompts (Ollama prompt_eval_duration)'
+)
+LLM_CONTEXT_REQUESTS = Counter(
+    'llm_context_requests_total', 'Generations by how the resume prefix was handled', ['outcome']
+)
+LLM_PROMPT_EVAL_TOKENS_SAVED = Counter(
+    'llm_prompt_eval_tokens_saved_total', 'Estimated prefix tokens not re-evaluated thanks to a reused KV context'
+)
+LLM_PROMPT_EVAL_SECONDS_SAVED = Counter(
+    'llm_prompt_eval_seconds_saved_total', 'Estimated prompt evaluation time saved by reused KV contexts'
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    'llm_generation_tokens_per_second', 'Generation speed of each response',
+    buckets=(1, 2.5, 5, 10, 20, 30, 50, 75, 100, 150, 250)
+)
+
+# Improvement output modes (full rewrite vs edit list)
+IMPROVEMENT_OUTPUT_TOKENS = Histogram(
+    'improvement_output_tokens', 'Tokens generated per improvement LLM call', ['output_mode'],
+    buckets=(25, 50, 100, 200, 400, 800, 1600, 3200, 6400)
+)
+IMPROVEMENT_SECONDS = Histogram(
+    'improvement_generation_seconds', 'Wall time per improvement LLM call', ['output_mode'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+)
+IMPROVEMENT_EDIT_FALLBACKS = Counter(
+    'improvement_edit_fallbacks_total', 'Edit-list improvements redone as full rewrites after a parse failure'
+)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def observe_llm_response(body: dict):
+    """Record Ollama's token counts and durations (nanoseconds) from a final response"""
+    eval_count = body.get('eval_count') or 0
+    eval_seconds = (body.get('eval_duration') or 0) / 1e9
+    LLM_EVAL_TOKENS.inc(eval_count)
+    LLM_EVAL_SECONDS.inc(eval_seconds)
+    LLM_PROMPT_EVAL_TOKENS.inc(body.get('prompt_eval_count') or 0)
+    LLM_PROMPT_EVAL_SECONDS.inc((body.get('prompt_eval_duration') or 0) / 1e9)
+    if eval_count and eval_seconds:
+        LLM_TOKENS_PER_SECOND.observe(eval_count / eval_seconds)
+
+
+def route_template(scope) -> str:
+    """Path template of the route serving a request, so ids do not become labels"""
+    router = scope.get('app')
+    for route in getattr(router, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        route = route_template(scope)
+        status_code: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            # Streaming responses count until their last chunk is sent
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, str(status_code or 500)).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    """Current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
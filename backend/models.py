@@ -1,21 +1,83 @@
-from sqlmodel import SQLModel, Field 
+from sqlmodel import SQLModel, Field, Column, JSON, Index
 from typing import Optional 
 from datetime import datetime 
 
 class User(SQLModel,table=True):
     id: Optional[int] = Field(default = None, primary_key = True) 
     username: Optional[str] 
-    email: Optional[str] 
+    email: Optional[str] = Field(default = None, unique = True, index = True)
     created_at: datetime = Field(default_factory = datetime.utcnow)
 
 class Resume(SQLModel,table=True):
+    __table_args__ = (Index('ix_resume_user_id_created_at', 'user_id', 'created_at'),)
+
     id: Optional[int] = Field(default = None, primary_key = True)
     user_id: int
     original_text: str 
     improved_text: Optional[str] = None 
+    # Parsed at upload: [{name, heading, start, end}] character offsets into
+    # original_text, and the email, phone and links from the header
+    sections: Optional[list] = Field(default = None, sa_column = Column(JSON))
+    contact: Optional[dict] = Field(default = None, sa_column = Column(JSON))
     created_at: datetime = Field(default_factory = datetime.utcnow)
 
+class LLMCacheEntry(SQLModel,table=True):
+    key: str = Field(primary_key = True)
+    model: str
+    response: str
+    created_at: datetime = Field(default_factory = datetime.utcnow)
 
+class ImprovementJob(SQLModel,table=True):
+    id: Optional[int] = Field(default = None, primary_key = True)
+    resume_id: int = Field(index = True)
+    analysis: dict = Field(default_factory = dict, sa_column = Column(JSON))
+    status: str = Field(default = 'queued', index = True)
+    result: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory = datetime.utcnow)
+    started_at: Optional[datetime] = None
+    # Renewed while the job runs, so a restarting process can tell live jobs from dead ones
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
+class ResumeVersion(SQLModel,table=True):
+    __table_args__ = (Index('ix_resumeversion_resume_id_version', 'resume_id', 'version', unique = True),)
 
-    
\ No newline at end of file
+    id: Optional[int] = Field(default = None, primary_key = True)
+    resume_id: int
+    version: int
+    # Version this one is diffed against; 0 is the resume's original_text
+    parent_version: int = 0
+    focus: Optional[str] = None
+    job_description_hash: Optional[str] = None
+    model: Optional[str] = None
+    # zlib-compressed full text when is_snapshot, otherwise a compressed line delta
+    is_snapshot: bool = False
+    data: bytes
+    text_length: int = 0
+    created_at: datetime = Field(default_factory = datetime.utcnow)
+
+class ResumeContext(SQLModel,table=True):
+    __table_args__ = (Index('ix_resumecontext_resume_id_prefix_hash', 'resume_id', 'prefix_hash', unique = True),)
+
+    id: Optional[int] = Field(default = None, primary_key = True)
+    resume_id: int
+    # sha256 of the model and the prompt prefix (resume and job description), so
+    # a changed original_text or job description never matches an old context
+    prefix_hash: str
+    model: str
+    # Ollama context tokens after evaluating the prefix, and the node that evaluated them
+    context: list = Field(default_factory = list, sa_column = Column(JSON))
+    backend: Optional[str] = None
+    prompt_eval_count: int = 0
+    prompt_eval_seconds: float = 0.0
+    # Rows without a context mark a prefix seen once; it is primed if it comes back
+    created_at: datetime = Field(default_factory = datetime.utcnow, index = True)
+
+class ExtractedDocument(SQLModel,table=True):
+    # sha256 of the uploaded file's bytes, so a re-upload is one primary key lookup
+    sha256: str = Field(primary_key = True)
+    text: str
+    size: int = 0
+    created_at: datetime = Field(default_factory = datetime.utcnow)
@@ -0,0 +1,132 @@
+import os
+import io
+import signal
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import PyPDF2
+from dotenv import load_dotenv
+
+from metrics import PDF_EXTRACT_FAILURES, PDF_EXTRACT_SECONDS, PDF_PAGES
+
+# Load environment variables
+load_dotenv()
+
+# PDF extraction configuration
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', str(os.cpu_count() or 2)))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '50'))
+PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', '8'))
+PDF_TIMEOUT = float(os.getenv('PDF_TIMEOUT', '20'))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be extracted within the configured limits"""
+
+
+def _on_deadline(signum, frame):
+    raise TimeoutError('PDF extraction exceeded its time limit')
+
+
+def _extract_range(reader: PyPDF2.PdfReader, start: int, end: int) -> List[str]:
+    return [(reader.pages[i].extract_text() or '') for i in range(start, end)]
+
+
+def _run_with_deadline(fn, timeout: float, *args):
+    # Runs in a pool worker's main thread, so SIGALRM interrupts PyPDF2 even
+    # while it is stuck in a pathological page
+    previous = signal.signal(signal.SIGALRM, _on_deadline)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_first(content: bytes, max_pages: int, chunk: int) -> Tuple[int, List[str]]:
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        return page_count, []
+    return page_count, _extract_range(reader, 0, min(chunk, page_count))
+
+
+def _extract_pages(content: bytes, start: int, end: int) -> List[str]:
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    return _extract_range(reader, start, end)
+
+
+def extract_first_task(content: bytes, max_pages: int, chunk: int, timeout: float) -> Tuple[int, List[str]]:
+    """Worker entry point: count pages and extract the first range"""
+    return _run_with_deadline(_extract_first, timeout, content, max_pages, chunk)
+
+
+def extract_pages_task(content: bytes, start: int, end: int, timeout: float) -> List[str]:
+    """Worker entry point: extract pages [start, end)"""
+    return _run_with_deadline(_extract_pages, timeout, content, start, end)
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared extraction process pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        # The pool is created from a running event loop that already has threads,
+        # and forking a multi-threaded process can deadlock the child
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def shutdown_pdf_pool():
+    """Stop the extraction workers"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def extract_pdf_pages(content: bytes) -> List[str]:
+    """Extract page-ordered text, fanning large documents out across the pool"""
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+
+    async def extract() -> List[str]:
+        page_count, pages = await loop.run_in_executor(
+            pool, extract_first_task, content, PDF_MAX_PAGES, PDF_PAGES_PER_TASK, PDF_TIMEOUT
+        )
+        if page_count > PDF_MAX_PAGES:
+            raise PDFExtractionError(f'PDF has {page_count} pages, the limit is {PDF_MAX_PAGES}')
+
+        ranges = [
+            (start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+        ]
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(pool, extract_pages_task, content, start, end, PDF_TIMEOUT)
+            for start, end in ranges
+        ])
+        for chunk in chunks:
+            pages.extend(chunk)
+        return pages
+
+    start = time.perf_counter()
+    try:
+        # Worker-side alarms bound each task; this bounds the whole document,
+        # including time spent waiting for a free worker
+        pages = await asyncio.wait_for(extract(), PDF_TIMEOUT)
+    except PDFExtractionError:
+        PDF_EXTRACT_FAILURES.inc()
+        raise
+    except (asyncio.TimeoutError, TimeoutError):
+        PDF_EXTRACT_FAILURES.inc()
+        raise PDFExtractionError(f'PDF extraction took longer than {PDF_TIMEOUT:g} seconds')
+    except Exception as e:
+        PDF_EXTRACT_FAILURES.inc()
+        raise PDFExtractionError(str(e)) from e
+    PDF_EXTRACT_SECONDS.observe(time.perf_counter() - start)
+    PDF_PAGES.observe(len(pages))
+    return pages
@@ -0,0 +1,139 @@
+import re
+from itertools import chain, repeat
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.\-/]*[a-z0-9+#]|[a-z0-9]')
+
+STOPWORDS = frozenset('''
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc every few for from
+further had has have having he her here hers him his how i if in into is it its itself just like make
+may me more most must my no nor not of off on once only or other our ours out over own per plus please
+same she should so some such than that the their theirs them then there these they this those through
+to too under until up us use used using very via was we well were what when where which while who whom
+why will with within without would you your yours
+ability able candidate candidates experience including job looking preferred required requirements
+responsibilities role skills strong team work working years year knowledge understanding excellent
+ideal new position company opportunity join based related
+'''.split())
+
+# Weight of keyword coverage versus cosine similarity in the overall score
+COVERAGE_WEIGHT = 0.5
+# A matched keyword pair ("machine learning") counts more than either word alone
+BIGRAM_WEIGHT = 1.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens that keep tech terms like c++, c#, node.js and ci/cd intact"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordScorer:
+    """Weighted keyword match of many resumes against one job description
+
+    Term weights come from the job description alone, so a resume scores the
+    same whether it is scored on its own or alongside any other resumes.
+    """
+
+    def __init__(self, job_description: str):
+        tokens = tokenize(job_description)
+        unigrams: Dict[str, int] = {}
+        for token in tokens:
+            if token not in STOPWORDS and len(token) > 1 and token not in unigrams:
+                unigrams[token] = len(unigrams)
+
+        # Adjacent keyword pairs ("machine learning", "project management")
+        bigrams: Dict[int, int] = {}
+        bigram_terms: List[str] = []
+        size = max(len(unigrams), 1)
+        for first, second in zip(tokens, tokens[1:]):
+            if first in unigrams and second in unigrams and first != second:
+                code = unigrams[first] * size + unigrams[second]
+                if code not in bigrams:
+                    bigrams[code] = len(unigrams) + len(bigram_terms)
+                    bigram_terms.append(f'{first} {second}')
+
+        self._unigrams = unigrams
+        self._unigram_count = size
+        self._bigram_codes = np.array(sorted(bigrams), dtype=np.int64)
+        self._bigram_columns = np.array([bigrams[code] for code in sorted(bigrams)], dtype=np.int64)
+        self.terms = list(unigrams) + bigram_terms
+        self.term_weights = np.concatenate([
+            np.ones(len(unigrams), dtype=np.float32),
+            np.full(len(bigram_terms), BIGRAM_WEIGHT, dtype=np.float32)
+        ])
+        self.query_counts = self._counts([tokens])[0]
+        # Sublinear TF weighting; terms the job description repeats matter more
+        self.query_weights = (1 + np.log(np.maximum(self.query_counts, 1))) * self.term_weights
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.terms)
+
+    def _counts(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Term counts over the job vocabulary, one row per token list"""
+        rows = len(token_lists)
+        vocabulary = self.vocabulary_size
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=rows)
+        flat_tokens = list(chain.from_iterable(token_lists))
+
+        # One C-level dict lookup per token for the whole batch
+        ids = np.array(list(map(self._unigrams.get, flat_tokens, repeat(-1, len(flat_tokens)))), dtype=np.int64)
+        row_of = np.repeat(np.arange(rows, dtype=np.int64), lengths)
+
+        keep = ids >= 0
+        cells = [row_of[keep] * vocabulary + ids[keep]]
+        if len(self._bigram_codes) and len(ids) > 1:
+            valid = (ids[:-1] >= 0) & (ids[1:] >= 0) & (row_of[:-1] == row_of[1:])
+            codes = ids[:-1][valid] * self._unigram_count + ids[1:][valid]
+            positions = np.minimum(np.searchsorted(self._bigram_codes, codes), len(self._bigram_codes) - 1)
+            found = self._bigram_codes[positions] == codes
+            cells.append(row_of[:-1][valid][found] * vocabulary + self._bigram_columns[positions[found]])
+
+        counts = np.bincount(np.concatenate(cells), minlength=rows * vocabulary)
+        return counts.reshape(rows, vocabulary).astype(np.float32)
+
+    def score(self, texts: Sequence[str], keywords: bool = True) -> List[dict]:
+        """Score each text; returns score (0-100), similarity, coverage and keyword lists"""
+        if not self.vocabulary_size or not texts:
+            return [
+                {'score': 0.0, 'similarity': 0.0, 'coverage': 0.0, 'matched_keywords': [], 'missing_keywords': []}
+                for _ in texts
+            ]
+
+        counts = self._counts([tokenize(text) for text in texts])
+        present = counts > 0
+
+        # Sublinear TF weighting with the same fixed term weights as the job description
+        resume_weights = np.where(present, 1 + np.log(np.maximum(counts, 1)), 0) * self.term_weights
+        query_weights = self.query_weights
+
+        norms = np.linalg.norm(resume_weights, axis=1) * np.linalg.norm(query_weights)
+        similarity = np.divide(resume_weights @ query_weights, norms, out=np.zeros(len(texts)), where=norms > 0)
+        coverage = (present * query_weights).sum(axis=1) / query_weights.sum()
+        scores = 100 * (COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * similarity)
+
+        if not keywords:
+            return [
+                {'score': round(float(scores[row]), 1), 'similarity': round(float(similarity[row]), 4),
+                 'coverage': round(float(coverage[row]), 4)}
+                for row in range(len(texts))
+            ]
+
+        # Keyword lists ordered by importance to the job description
+        order = np.argsort(-query_weights, kind='stable')
+        terms = [self.terms[i] for i in order]
+        ordered_present = present[:, order]
+        results = []
+        for row in range(len(texts)):
+            row_present = ordered_present[row]
+            results.append({
+                'score': round(float(scores[row]), 1),
+                'similarity': round(float(similarity[row]), 4),
+                'coverage': round(float(coverage[row]), 4),
+                'matched_keywords': [term for term, hit in zip(terms, row_present) if hit],
+                'missing_keywords': [term for term, hit in zip(terms, row_present) if not hit]
+            })
+        return results
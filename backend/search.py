@@ -0,0 +1,175 @@
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import engine, SEARCH_CONFIG
+from models import Resume
+from scoring import STOPWORDS, tokenize
+
+SNIPPET_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8, FragmentDelimiter=" ... "'
+SNIPPET_RADIUS = 80
+INDEX_BUILD_BATCH_SIZE = 1000
+
+
+def uses_postgres_search() -> bool:
+    return engine.dialect.name == 'postgresql'
+
+
+def search_terms(query: str) -> List[str]:
+    return [term for term in tokenize(query) if term not in STOPWORDS]
+
+
+class InvertedIndex:
+    """In-process BM25 index used when the database has no full-text search"""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.built = False
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._terms: Dict[int, List[str]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._users: Dict[int, int] = {}
+        self._total_length = 0
+
+    async def build(self, session: AsyncSession):
+        """Index every stored resume, reading rows in batches"""
+        last_id = 0
+        while True:
+            statement = (
+                select(Resume.id, Resume.user_id, Resume.original_text, Resume.improved_text)
+                .where(Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(INDEX_BUILD_BATCH_SIZE)
+            )
+            rows = (await session.exec(statement)).all()
+            if not rows:
+                break
+            for row in rows:
+                self.add(row.id, row.user_id, row.original_text, row.improved_text)
+            last_id = rows[-1].id
+        self.built = True
+
+    def add(self, resume_id: int, user_id: int, original_text: str, improved_text: Optional[str] = None):
+        """Index (or re-index) one resume"""
+        self.remove(resume_id)
+        tokens = tokenize(original_text + ' ' + (improved_text or ''))
+        counts = Counter(token for token in tokens if token not in STOPWORDS)
+        for term, count in counts.items():
+            self._postings[term][resume_id] = count
+        self._terms[resume_id] = list(counts)
+        self._lengths[resume_id] = len(tokens)
+        self._users[resume_id] = user_id
+        self._total_length += len(tokens)
+
+    def remove(self, resume_id: int):
+        for term in self._terms.pop(resume_id, []):
+            postings = self._postings[term]
+            postings.pop(resume_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(resume_id, 0)
+        self._users.pop(resume_id, None)
+
+    def search(self, terms: List[str], limit: int, offset: int = 0,
+               user_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Resumes containing every term, ranked by BM25"""
+        if not terms or not self._lengths:
+            return []
+        postings = [self._postings.get(term, {}) for term in terms]
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        if user_id is not None:
+            candidates = {resume_id for resume_id in candidates if self._users.get(resume_id) == user_id}
+
+        documents = len(self._lengths)
+        average_length = self._total_length / documents or 1
+        scores = dict.fromkeys(candidates, 0.0)
+        for posting in postings:
+            idf = math.log(1 + (documents - len(posting) + 0.5) / (len(posting) + 0.5))
+            for resume_id in candidates:
+                frequency = posting[resume_id]
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[resume_id] / average_length)
+                scores[resume_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[offset:offset + limit]
+
+
+def make_snippet(body: str, terms: List[str]) -> str:
+    """Window around the first matching term with matches wrapped in <mark>"""
+    if not terms:
+        return body[:2 * SNIPPET_RADIUS]
+    pattern = re.compile(r'(?<![a-z0-9])(' + '|'.join(re.escape(term) for term in terms) + r')(?![a-z0-9])',
+                         re.IGNORECASE)
+    match = pattern.search(body)
+    start = max(0, match.start() - SNIPPET_RADIUS) if match else 0
+    end = min(len(body), (match.end() if match else 0) + SNIPPET_RADIUS)
+    window = ' '.join(body[start:end].split())
+    return ('... ' if start else '') + pattern.sub(r'<mark>\1</mark>', window) + (' ...' if end < len(body) else '')
+
+
+inverted_index = InvertedIndex()
+
+
+def index_resume(resume_id: int, user_id: int, original_text: str, improved_text: Optional[str] = None):
+    """Keep the fallback index in step with inserts and updates"""
+    if not uses_postgres_search() and inverted_index.built:
+        inverted_index.add(resume_id, user_id, original_text, improved_text)
+
+
+async def search_resumes(session: AsyncSession, query: str, limit: int, offset: int = 0,
+                         user_id: Optional[int] = None) -> List[dict]:
+    """Ranked resume matches with highlighted snippets"""
+    if uses_postgres_search():
+        user_filter = 'AND r.user_id = :user_id' if user_id is not None else ''
+        # Headlines are expensive, so only the requested page gets them
+        statement = text(f'''
+            WITH q AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS query),
+            hits AS (
+                SELECT r.id, r.user_id, r.created_at, ts_rank_cd(r.search_vector, q.query) AS rank
+                FROM resume r, q
+                WHERE r.search_vector @@ q.query {user_filter}
+                ORDER BY rank DESC, r.id
+                LIMIT :limit OFFSET :offset
+            )
+            SELECT hits.id, hits.user_id, hits.created_at, hits.rank,
+                   ts_headline('{SEARCH_CONFIG}', r.original_text || ' ' || coalesce(r.improved_text, ''), q.query,
+                               '{SNIPPET_OPTIONS}') AS snippet
+            FROM hits JOIN resume r ON r.id = hits.id, q
+            ORDER BY hits.rank DESC, hits.id
+        ''')
+        params = {'query': query, 'limit': limit, 'offset': offset}
+        if user_id is not None:
+            params['user_id'] = user_id
+        rows = (await session.execute(statement, params)).all()
+        return [
+            {'resume_id': row.id, 'user_id': row.user_id, 'created_at': row.created_at,
+             'rank': float(row.rank), 'snippet': row.snippet}
+            for row in rows
+        ]
+
+    if not inverted_index.built:
+        await inverted_index.build(session)
+    terms = search_terms(query)
+    ranked = inverted_index.search(terms, limit, offset, user_id)
+    if not ranked:
+        return []
+    statement = select(Resume).where(Resume.id.in_([resume_id for resume_id, _ in ranked]))
+    rows = {resume.id: resume for resume in (await session.exec(statement)).all()}
+    return [
+        {'resume_id': resume_id, 'user_id': rows[resume_id].user_id, 'created_at': rows[resume_id].created_at,
+         'rank': round(score, 4),
+         'snippet': make_snippet(rows[resume_id].original_text + '\n' + (rows[resume_id].improved_text or ''), terms)}
+        for resume_id, score in ranked
+        if resume_id in rows
+    ]
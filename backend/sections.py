@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Canonical section names keyed by the heading variants that map to them
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me', 'overview'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'relevant experience'],
+    'education': ['education', 'academic background', 'education and training', 'qualifications'],
+    'skills': ['skills', 'technical skills', 'core competencies', 'competencies', 'key skills',
+               'skills and abilities', 'technologies', 'tools'],
+    'projects': ['projects', 'personal projects', 'key projects', 'selected projects'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'licenses and certifications'],
+    'publications': ['publications', 'selected publications', 'papers'],
+    'research': ['research', 'research experience', 'research interests'],
+    'teaching': ['teaching', 'teaching experience'],
+    'awards': ['awards', 'honors', 'honors and awards', 'achievements', 'accomplishments'],
+    'leadership': ['leadership', 'leadership experience', 'activities', 'extracurricular activities'],
+    'volunteer': ['volunteer', 'volunteering', 'volunteer experience', 'community involvement'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests'],
+    'references': ['references'],
+}
+
+_HEADING_LOOKUP = {variant: name for name, variants in SECTION_HEADINGS.items() for variant in variants}
+_HEADING_CLEANUP = re.compile(r'[^a-z& ]+')
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_PHONE = re.compile(r'\+?\(?\d[\d\s().-]{7,}\d')
+_LINK = re.compile(r'(?:https?://|www\.)\S+|\b(?:linkedin\.com|github\.com|gitlab\.com)/\S+', re.IGNORECASE)
+
+
+@dataclass
+class Section:
+    """A contiguous block of resume text; text includes the heading line"""
+    name: str
+    heading: Optional[str]
+    text: str
+
+
+def canonical_heading(line: str, allow_unknown: bool = True) -> Optional[str]:
+    """Return the canonical section name if a line looks like a section heading"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40 or stripped.endswith('.'):
+        return None
+
+    cleaned = _HEADING_CLEANUP.sub('', stripped.lower().replace('&', 'and')).strip()
+    cleaned = ' '.join(cleaned.split())
+    if cleaned in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[cleaned]
+
+    # Unknown ALL-CAPS headings still start a new section
+    if not allow_unknown:
+        return None
+    words = stripped.rstrip(':').split()
+    if stripped.isupper() and 1 <= len(words) <= 4 and any(c.isalpha() for c in stripped):
+        return cleaned.replace(' ', '_') or None
+    return None
+
+
+def split_sections(text: str) -> List[Section]:
+    """Split resume text at section headings; joining the texts gives back the input"""
+    sections: List[Section] = []
+    name, heading, lines = 'header', None, []
+
+    for line in text.splitlines(keepends=True):
+        # Before the first recognised heading, ALL-CAPS lines are usually the
+        # candidate's name or title rather than a section
+        line_name = canonical_heading(line, allow_unknown=heading is not None)
+        if line_name:
+            if lines:
+                sections.append(Section(name=name, heading=heading, text=''.join(lines)))
+            name, heading, lines = line_name, line.strip(), []
+        lines.append(line)
+
+    if lines:
+        sections.append(Section(name=name, heading=heading, text=''.join(lines)))
+    return sections
+
+
+def parse_contact(text: str) -> Dict:
+    """Email, phone number and profile links found in a block of text"""
+    emails = _EMAIL.findall(text)
+    # At least 10 digits, so date ranges such as 2019 - 2021 are not phone numbers
+    phones = [match.strip() for match in _PHONE.findall(text) if 10 <= sum(c.isdigit() for c in match) <= 15]
+    links = [link.rstrip('.,;)') for link in _LINK.findall(text)]
+    return {
+        'email': emails[0] if emails else None,
+        'phone': phones[0] if phones else None,
+        'links': list(dict.fromkeys(links))
+    }
+
+
+def section_spans(sections: List[Section]) -> List[Dict]:
+    """Name, heading and [start, end) character offsets of each section, for a JSON column"""
+    spans, start = [], 0
+    for section in sections:
+        end = start + len(section.text)
+        spans.append({'name': section.name, 'heading': section.heading, 'start': start, 'end': end})
+        start = end
+    return spans
+
+
+def resume_sections(text: str, spans: Optional[List[Dict]] = None) -> List[Section]:
+    """Sections of a resume from its stored offsets, parsing the text when none are stored"""
+    if not spans or 'start' not in spans[0]:
+        return split_sections(text)
+    return [Section(name=span['name'], heading=span['heading'], text=text[span['start']:span['end']]) for span in spans]
+
+
+def parse_resume(text: str) -> Tuple[List[Dict], Dict]:
+    """Section offsets into text and the contact details from the header"""
+    sections = split_sections(text)
+    header = sections[0].text if sections and sections[0].name == 'header' else ''
+    return section_spans(sections), parse_contact(header)
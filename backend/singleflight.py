@@ -0,0 +1,49 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream execution"""
+
+    def __init__(self):
+        self._inflight: Dict[str, Tuple[asyncio.Task, float]] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.seconds_saved = 0.0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn once per key at a time; returns (result, shared)"""
+        entry = self._inflight.get(key)
+        if entry is not None:
+            task, started = entry
+            self.coalesced += 1
+            # shield: a follower going away must not cancel the shared call
+            result = await asyncio.shield(task)
+            self.seconds_saved += time.monotonic() - started
+            return result, True
+
+        task = asyncio.create_task(fn())
+        self._inflight[key] = (task, time.monotonic())
+        self.executions += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, task: asyncio.Task):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._inflight),
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'seconds_saved': round(self.seconds_saved, 3)
+        }
+
+
+improvement_flight = SingleFlight()
@@ -0,0 +1,29 @@
+"""
+Regression tests for section chunking
+Run with pytest, or directly with python
+"""
+from chunking import chunk_resume, estimate_tokens
+
+
+def test_long_section_followed_by_another():
+    """An oversized section that is not the last one is split, not recursed on forever"""
+    long_section = 'PUBLICATIONS\n' + '- A paper on distributed systems, Journal of Examples, 2021\n' * 800
+    resume = 'EXPERIENCE\n- Built things\n\n' + long_section + '\nEDUCATION\nBSc Computer Science'
+    chunks = chunk_resume(resume, 300)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    assert chunks[-1].endswith('BSc Computer Science')
+    assert ''.join(chunks).replace('\n', '') == resume.replace('\n', '')
+
+
+def test_oversized_single_line_is_hard_split():
+    resume = 'SUMMARY\n' + 'x' * 5000 + '\n\nSKILLS\nPython'
+    chunks = chunk_resume(resume, 300)
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    assert chunks[-1].endswith('Python')
+
+
+if __name__ == '__main__':
+    test_long_section_followed_by_another()
+    test_oversized_single_line_is_hard_split()
+    print('✓ Chunking tests passed')
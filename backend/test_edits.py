@@ -0,0 +1,60 @@
+"""
+Tests for parsing and applying line edits
+Run with pytest, or directly with python
+"""
+from edits import EditParseError, apply_edits, number_lines, parse_edits
+
+SOURCE = 'Jane Doe\nSkills\npython, sql\nProjects\nbuilt a thing'
+
+
+def assert_rejected(response: str):
+    try:
+        parse_edits(response, SOURCE)
+    except EditParseError:
+        return
+    raise AssertionError(f'{response!r} should be rejected')
+
+
+def test_number_lines():
+    assert number_lines('a\nb') == '1| a\n2| b'
+
+
+def test_parse_inside_code_fence():
+    response = '```json\n[{"line": 3, "text": "Python, SQL"}]\n```'
+    assert parse_edits(response, SOURCE) == {3: 'Python, SQL'}
+
+
+def test_out_of_range_lines_are_rejected():
+    assert_rejected('[{"line": 0, "text": "x"}]')
+    assert_rejected('[{"line": 6, "text": "x"}]')
+
+
+def test_duplicate_lines_are_rejected():
+    assert_rejected('[{"line": 2, "text": "x"}, {"line": 2, "text": "y"}]')
+
+
+def test_malformed_edits_are_rejected():
+    assert_rejected('[{"line": true, "text": "x"}]')
+    assert_rejected('[{"line": "2", "text": "x"}]')
+    assert_rejected('[{"line": 2, "text": null}]')
+    assert_rejected('no edits here')
+
+
+def test_empty_replacement_deletes_the_line():
+    assert apply_edits(SOURCE, {4: '', 5: ''}) == 'Jane Doe\nSkills\npython, sql'
+
+
+def test_multi_line_replacement_splits_the_line():
+    improved = apply_edits(SOURCE, {3: 'Python\nSQL'})
+    assert improved == 'Jane Doe\nSkills\nPython\nSQL\nProjects\nbuilt a thing'
+
+
+if __name__ == '__main__':
+    test_number_lines()
+    test_parse_inside_code_fence()
+    test_out_of_range_lines_are_rejected()
+    test_duplicate_lines_are_rejected()
+    test_malformed_edits_are_rejected()
+    test_empty_replacement_deletes_the_line()
+    test_multi_line_replacement_splits_the_line()
+    print('✓ Edit tests passed')
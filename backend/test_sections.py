@@ -0,0 +1,44 @@
+"""
+Tests for section offsets
+Run with pytest, or directly with python
+"""
+from sections import parse_resume, resume_sections, section_spans, split_sections
+
+RESUME = 'JANE DOE\njane@example.com\n\nSkills\npython, sql\n\nWORK EXPERIENCE\nEngineer at Acme\n\nEducation\nBSc'
+
+
+def test_sections_join_back_to_the_text():
+    sections = split_sections(RESUME)
+    assert [section.name for section in sections] == ['header', 'skills', 'experience', 'education']
+    assert ''.join(section.text for section in sections) == RESUME
+
+
+def test_offsets_slice_the_original_text():
+    spans, contact = parse_resume(RESUME)
+    assert contact['email'] == 'jane@example.com'
+    assert spans[0]['start'] == 0 and spans[-1]['end'] == len(RESUME)
+    for previous, span in zip(spans, spans[1:]):
+        assert previous['end'] == span['start']
+    for span, section in zip(spans, resume_sections(RESUME, spans)):
+        assert section.text == RESUME[span['start']:span['end']]
+        assert section.text.startswith(span['heading'] or 'JANE DOE')
+
+
+def test_stored_offsets_round_trip():
+    sections = split_sections(RESUME)
+    assert resume_sections(RESUME, section_spans(sections)) == sections
+
+
+def test_legacy_spans_are_parsed_again():
+    # Resumes stored before offsets existed only have names and headings
+    legacy = [{'name': 'skills', 'heading': 'Skills'}]
+    assert resume_sections(RESUME, legacy) == split_sections(RESUME)
+    assert resume_sections(RESUME, None) == split_sections(RESUME)
+
+
+if __name__ == '__main__':
+    test_sections_join_back_to_the_text()
+    test_offsets_slice_the_original_text()
+    test_stored_offsets_round_trip()
+    test_legacy_spans_are_parsed_again()
+    print('✓ Section tests passed')
@@ -0,0 +1,50 @@
+"""
+Tests for version deltas and materialising versions
+Run with pytest, or directly with python
+"""
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import versions
+from models import Resume
+from versions import VersionCache, apply_delta, commit_improvement, make_delta, materialize
+
+ORIGINAL = 'Jane Doe\nSkills\npython, sql\nProjects\nbuilt a thing\n'
+
+
+def test_delta_round_trip():
+    improved = 'Jane Doe\nSkills\nPython, SQL, FastAPI\nProjects\nbuilt a thing\nEducation\nBSc'
+    for parent, text in [(ORIGINAL, improved), (improved, ORIGINAL), (ORIGINAL, ''), ('', ORIGINAL)]:
+        assert apply_delta(parent, make_delta(parent, text)) == text
+
+
+def test_materialize_every_version():
+    async def run():
+        engine = create_async_engine('sqlite+aiosqlite://')
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        texts = [ORIGINAL] + [ORIGINAL + f'Award {number}\n' * number for number in range(1, 13)]
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            resume = Resume(user_id=1, filename='resume.txt', original_text=ORIGINAL)
+            session.add(resume)
+            await session.commit()
+            for text in texts[1:]:
+                await commit_improvement(session, resume, text)
+
+            # Read every version back from the stored snapshots and deltas, not the cache
+            versions.version_cache = VersionCache()
+            for number, text in enumerate(texts):
+                assert await materialize(session, resume, number) == text
+            assert await materialize(session, resume, len(texts)) is None
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_delta_round_trip()
+    test_materialize_every_version()
+    print('✓ Version tests passed')
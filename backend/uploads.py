@@ -0,0 +1,105 @@
+import os
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import ExtractedDocument
+from metrics import PDF_EXTRACT_DEDUPLICATED
+
+# Load environment variables
+load_dotenv()
+
+# Upload configuration; Starlette spools each uploaded file to a temporary file
+# that moves to disk past 1 MB, and it is only ever read UPLOAD_CHUNK_SIZE at a time
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(64 * 1024)))
+# Whole request body of a bulk upload, which carries many files
+BULK_UPLOAD_MAX_BYTES = int(os.getenv('BULK_UPLOAD_MAX_BYTES', str(512 * 1024 * 1024)))
+# Multipart boundaries, part headers and form fields around the file itself
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded file is larger than UPLOAD_MAX_BYTES"""
+
+
+async def hash_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[str, int]:
+    """SHA-256 and size of an upload, read in chunks and rewound afterwards"""
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f'File is larger than {max_bytes} bytes')
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f'File is larger than {max_bytes} bytes')
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware rejecting upload bodies over their cap before the form is parsed
+
+    Starlette's multipart parser reads the whole body into its spool files
+    before an endpoint runs, so the cap has to be enforced on the way in:
+    on Content-Length up front, and on the bytes received for chunked bodies.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope['path']) if scope['type'] == 'http' and scope['method'] == 'POST' else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f'Request body is larger than {limit} bytes'
+        content_length = dict(scope['headers']).get(b'content-length', b'')
+        if content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({'detail': detail}, status_code=status.HTTP_413_CONTENT_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def get_extracted_text(session: AsyncSession, sha256: str) -> Optional[str]:
+    """Text already extracted from a byte-identical file, by primary key"""
+    document = await session.get(ExtractedDocument, sha256)
+    if document is None:
+        return None
+    PDF_EXTRACT_DEDUPLICATED.inc()
+    return document.text
+
+
+async def store_extracted_text(session: AsyncSession, sha256: str, text: str, size: int):
+    try:
+        await session.merge(ExtractedDocument(sha256=sha256, text=text, size=size))
+        await session.commit()
+    except SQLAlchemyError as e:
+        # A concurrent upload of the same file stored it first
+        await session.rollback()
+        print(f'✗ Failed to store extracted text: {e}')
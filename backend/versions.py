@@ -0,0 +1,218 @@
+import os
+import json
+import zlib
+import hashlib
+import difflib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Resume, ResumeVersion
+
+# Load environment variables
+load_dotenv()
+
+# Version history configuration; every Nth version is stored in full so
+# materialising any version applies at most N - 1 deltas
+VERSION_SNAPSHOT_INTERVAL = int(os.getenv('VERSION_SNAPSHOT_INTERVAL', '10'))
+VERSION_CACHE_SIZE = int(os.getenv('VERSION_CACHE_SIZE', '256'))
+VERSION_COMMIT_ATTEMPTS = 3
+
+
+def hash_job_description(job_description: Optional[str]) -> Optional[str]:
+    if not job_description:
+        return None
+    return hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+
+
+def make_delta(parent: str, text: str) -> bytes:
+    """Compressed line edit script: [start, end] copies parent lines, a string inserts text"""
+    parent_lines = parent.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    operations = []
+    matcher = difflib.SequenceMatcher(None, parent_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            operations.append([i1, i2])
+        elif j2 > j1:
+            operations.append(''.join(lines[j1:j2]))
+    return zlib.compress(json.dumps(operations, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def apply_delta(parent: str, data: bytes) -> str:
+    parent_lines = parent.splitlines(keepends=True)
+    parts = []
+    for operation in json.loads(zlib.decompress(data)):
+        if isinstance(operation, list):
+            parts.extend(parent_lines[operation[0]:operation[1]])
+        else:
+            parts.append(operation)
+    return ''.join(parts)
+
+
+class VersionCache:
+    """LRU of recently materialised version texts; versions never change once written"""
+
+    def __init__(self, max_entries: int = VERSION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[int, int], str]' = OrderedDict()
+
+    def get(self, resume_id: int, version: int) -> Optional[str]:
+        text = self._entries.get((resume_id, version))
+        if text is not None:
+            self._entries.move_to_end((resume_id, version))
+        return text
+
+    def put(self, resume_id: int, version: int, text: str):
+        if self.max_entries <= 0:
+            return
+        self._entries[(resume_id, version)] = text
+        self._entries.move_to_end((resume_id, version))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+version_cache = VersionCache()
+
+
+async def latest_version(session: AsyncSession, resume_id: int) -> Optional[ResumeVersion]:
+    statement = (
+        select(ResumeVersion)
+        .where(ResumeVersion.resume_id == resume_id)
+        .order_by(ResumeVersion.version.desc())
+        .limit(1)
+    )
+    return (await session.exec(statement)).first()
+
+
+async def materialize(session: AsyncSession, resume: Resume, version: int) -> Optional[str]:
+    """Full text of a version (0 is the original text), or None if it does not exist"""
+    if version == 0:
+        return resume.original_text
+    text = version_cache.get(resume.id, version)
+    if text is not None:
+        return text
+
+    # The chain back to the nearest snapshot (or the original text) in one query
+    snapshot = (
+        select(func.max(ResumeVersion.version))
+        .where(
+            ResumeVersion.resume_id == resume.id,
+            ResumeVersion.is_snapshot,
+            ResumeVersion.version <= version
+        )
+        .scalar_subquery()
+    )
+    statement = (
+        select(ResumeVersion)
+        .where(
+            ResumeVersion.resume_id == resume.id,
+            ResumeVersion.version <= version,
+            ResumeVersion.version >= func.coalesce(snapshot, 0)
+        )
+        .order_by(ResumeVersion.version)
+    )
+    chain = (await session.exec(statement)).all()
+    if not chain or chain[-1].version != version:
+        return None
+
+    # Start from the newest version that is already cached
+    start, text = 0, resume.original_text
+    for position in range(len(chain) - 1, -1, -1):
+        cached = version_cache.get(resume.id, chain[position].version)
+        if cached is not None:
+            start, text = position + 1, cached
+            break
+    for row in chain[start:]:
+        text = zlib.decompress(row.data).decode('utf-8') if row.is_snapshot else apply_delta(text, row.data)
+    version_cache.put(resume.id, version, text)
+    return text
+
+
+async def _new_version(session: AsyncSession, resume: Resume, text: str, focus: Optional[str],
+                       job_description: Optional[str], model: Optional[str],
+                       parent: Optional[int] = None) -> ResumeVersion:
+    if parent is None:
+        latest = await latest_version(session, resume.id)
+        parent = latest.version if latest else 0
+    data = zlib.compress(text.encode('utf-8'), 9)
+    is_snapshot = True
+    if (parent + 1) % VERSION_SNAPSHOT_INTERVAL:
+        delta = make_delta(await materialize(session, resume, parent), text)
+        # A rewrite that shares little with its parent is cheaper stored whole
+        if len(delta) < len(data):
+            data, is_snapshot = delta, False
+    return ResumeVersion(
+        resume_id=resume.id,
+        version=parent + 1,
+        parent_version=parent,
+        focus=focus,
+        job_description_hash=hash_job_description(job_description),
+        model=model,
+        is_snapshot=is_snapshot,
+        data=data,
+        text_length=len(text)
+    )
+
+
+async def commit_improvement(session: AsyncSession, resume: Resume, text: str, focus: Optional[str] = None,
+                             job_description: Optional[str] = None, model: Optional[str] = None) -> ResumeVersion:
+    """Make text the resume's latest improvement and record it as a new version, in one commit"""
+    for attempt in range(VERSION_COMMIT_ATTEMPTS):
+        version = await _new_version(session, resume, text, focus, job_description, model)
+        resume.improved_text = text
+        session.add(resume)
+        session.add(version)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent improvement took this version number; build on top of it
+            await session.rollback()
+            if attempt == VERSION_COMMIT_ATTEMPTS - 1:
+                raise
+            await session.refresh(resume)
+            continue
+        version_cache.put(resume.id, version.version, text)
+        return version
+
+
+async def commit_improvements(session: AsyncSession, improvements: List[Tuple[Resume, str]], focus: Optional[str] = None,
+                              job_description: Optional[str] = None, model: Optional[str] = None) -> Dict[int, int]:
+    """commit_improvement for many resumes in one commit; returns resume id -> new version"""
+    if not improvements:
+        return {}
+    statement = (
+        select(ResumeVersion.resume_id, func.max(ResumeVersion.version))
+        .where(ResumeVersion.resume_id.in_([resume.id for resume, _ in improvements]))
+        .group_by(ResumeVersion.resume_id)
+    )
+    parents = dict((await session.exec(statement)).all())
+
+    versions = []
+    for resume, text in improvements:
+        version = await _new_version(session, resume, text, focus, job_description, model, parents.get(resume.id, 0))
+        resume.improved_text = text
+        session.add(resume)
+        session.add(version)
+        versions.append((resume, text, version))
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent improvement took one of the version numbers; commit one by one instead
+        await session.rollback()
+        committed = {}
+        for resume, text in improvements:
+            await session.refresh(resume)
+            committed[resume.id] = (await commit_improvement(
+                session, resume, text, focus, job_description, model
+            )).version
+        return committed
+
+    for resume, text, version in versions:
+        version_cache.put(resume.id, version.version, text)
+    return {resume.id: version.version for resume, _, version in versions}
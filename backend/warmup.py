@@ -0,0 +1,90 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from llm import QWEN_KEEP_ALIVE, QWEN_MODEL, LLMError, llm_router, load_model
+from metrics import LLM_MODEL_READY
+
+# Load environment variables
+load_dotenv()
+
+# Keep-warm configuration; pings should come well inside QWEN_KEEP_ALIVE
+LLM_KEEP_WARM_INTERVAL = float(os.getenv('LLM_KEEP_WARM_INTERVAL', '240'))
+# Retry delay while the model has never loaded or the last ping failed
+LLM_WARMUP_RETRY_INTERVAL = float(os.getenv('LLM_WARMUP_RETRY_INTERVAL', '5'))
+
+
+class ModelWarmer:
+    """Loads QWEN_MODEL on every backend at startup and pings it periodically so Ollama never unloads it"""
+
+    def __init__(self, interval: float = LLM_KEEP_WARM_INTERVAL, retry_interval: float = LLM_WARMUP_RETRY_INTERVAL):
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.last_success: Optional[datetime] = None
+        self.backends: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start warming in the background; /ready reports not ready until the first load succeeds"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """At least one backend in rotation has the model loaded"""
+        return any(
+            backend.healthy and self.backends.get(backend.url, {}).get('ready', False)
+            for backend in llm_router.backends
+        )
+
+    async def _ping_backend(self, url: str) -> bool:
+        was_ready = self.backends.get(url, {}).get('ready', False)
+        start = time.perf_counter()
+        try:
+            body = await load_model(url)
+        except LLMError as e:
+            self.backends[url] = {'ready': False, 'last_load_seconds': None, 'error': str(e)}
+            print(f'✗ Could not load {QWEN_MODEL} on {url}: {e}')
+            return False
+
+        if not was_ready:
+            print(f'✓ Model {QWEN_MODEL} loaded on {url} in {time.perf_counter() - start:.1f}s')
+        # Ollama reports its own load time in nanoseconds; near zero when already resident
+        self.backends[url] = {'ready': True, 'last_load_seconds': (body.get('load_duration') or 0) / 1e9, 'error': None}
+        return True
+
+    async def ping(self) -> bool:
+        """Load (or keep resident) the model on every backend; True when all succeeded"""
+        results = await asyncio.gather(*[self._ping_backend(backend.url) for backend in llm_router.backends])
+        if any(results):
+            self.last_success = datetime.utcnow()
+        LLM_MODEL_READY.set(1 if self.ready else 0)
+        return all(results)
+
+    async def _run(self):
+        while True:
+            ok = await self.ping()
+            if self.interval <= 0 and ok:
+                return
+            await asyncio.sleep(self.interval if ok and self.interval > 0 else self.retry_interval)
+
+    def status(self) -> dict:
+        return {
+            'ready': self.ready,
+            'model': QWEN_MODEL,
+            'keep_alive': QWEN_KEEP_ALIVE,
+            'last_success': self.last_success.isoformat() if self.last_success else None,
+            'backends': self.backends
+        }
+
+
+model_warmer = ModelWarmer()